@@ -1,17 +1,23 @@
 import pandas as pd
 import numpy as np
-import tkinter as tk
-from tkinter import filedialog
 import re
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import warnings
 import time
 import multiprocessing as mp
 import psutil
 import pymysql
 from sqlalchemy import create_engine, text
+from pandas.api.types import union_categoricals
 import urllib.parse
+import sqlite3
+import hashlib
+import functools
+import threading
+import queue
+import json
+import uuid
 
 # Import DEFAULT_OUTPUT_PATH untuk output
 try:
@@ -54,30 +60,74 @@ def format_duration(seconds):
         remaining_seconds = seconds % 60
         return f"{hours} jam {minutes} menit {remaining_seconds:.1f} detik"
 
-def create_db_connection():
-    """Create database connection using SQLAlchemy"""
-    try:
+# Pengaturan connection pool SQLAlchemy (satu engine per konfigurasi database)
+DB_POOL_CONFIG = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_recycle': 3600,
+    'pool_pre_ping': True,  # Health check koneksi setiap checkout dari pool
+}
+
+_ENGINE_REGISTRY = {}
+_ENGINE_REGISTRY_LOCK = threading.Lock()
+
+def get_engine(db_config, connect_args=None):
+    """
+    Return pooled SQLAlchemy engine for a database config. The engine is
+    created (and tested with SELECT 1) only on first use, then reused for
+    the life of the process.
+    """
+    key = (db_config['host'], db_config['port'], db_config['user'], db_config['database'])
+    
+    with _ENGINE_REGISTRY_LOCK:
+        engine = _ENGINE_REGISTRY.get(key)
+        if engine is not None:
+            return engine
+        
         # URL encode password to handle special characters
-        password_encoded = urllib.parse.quote_plus(DB_CONFIG['password'])
+        password_encoded = urllib.parse.quote_plus(db_config['password'])
         
         # Create connection string for MariaDB
         connection_string = (
-            f"mysql+pymysql://{DB_CONFIG['user']}:{password_encoded}@"
-            f"{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}"
+            f"mysql+pymysql://{db_config['user']}:{password_encoded}@"
+            f"{db_config['host']}:{db_config['port']}/{db_config['database']}"
             f"?charset=utf8mb4"
         )
         
         # Create engine
         engine = create_engine(
             connection_string,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-            echo=False
+            connect_args=connect_args or {},
+            echo=False,
+            **DB_POOL_CONFIG
         )
         
         # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            engine.dispose()
+            raise
+        
+        _ENGINE_REGISTRY[key] = engine
+        return engine
+
+def dispose_engines():
+    """Close all pooled database connections (call on application exit)"""
+    with _ENGINE_REGISTRY_LOCK:
+        for engine in _ENGINE_REGISTRY.values():
+            try:
+                engine.dispose()
+            except Exception:
+                pass
+        _ENGINE_REGISTRY.clear()
+
+def create_db_connection():
+    """Get database engine (pooled, reused across runs) using SQLAlchemy"""
+    try:
+        # local_infile untuk LOAD DATA LOCAL INFILE
+        engine = get_engine(DB_CONFIG, connect_args={'local_infile': True})
         
         try:
             print(f"[INFO] Koneksi database berhasil ke {DB_CONFIG['host']}")
@@ -94,29 +144,9 @@ def create_db_connection():
         return None
 
 def create_admin_db_connection():
-    """Create admin database connection for DELETE operations using SQLAlchemy"""
+    """Get admin database engine for DELETE operations (pooled, reused) using SQLAlchemy"""
     try:
-        # URL encode password to handle special characters
-        password_encoded = urllib.parse.quote_plus(DB_ADMIN_CONFIG['password'])
-        
-        # Create connection string for MariaDB
-        connection_string = (
-            f"mysql+pymysql://{DB_ADMIN_CONFIG['user']}:{password_encoded}@"
-            f"{DB_ADMIN_CONFIG['host']}:{DB_ADMIN_CONFIG['port']}/{DB_ADMIN_CONFIG['database']}"
-            f"?charset=utf8mb4"
-        )
-        
-        # Create engine
-        engine = create_engine(
-            connection_string,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-            echo=False
-        )
-        
-        # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        engine = get_engine(DB_ADMIN_CONFIG)
         
         try:
             print(f"[INFO] Koneksi admin database berhasil ke {DB_ADMIN_CONFIG['host']}")
@@ -132,8 +162,190 @@ def create_admin_db_connection():
             pass
         return None
 
-def upload_to_database(df, engine):
-    """Upload dataframe to database using INSERT ON DUPLICATE KEY UPDATE"""
+# Jumlah baris per batch upload (setiap batch di-commit sendiri)
+DEFAULT_UPLOAD_BATCH_SIZE = 5000
+
+# Database (URL engine) tempat LOAD DATA gagal sebelum batch pertama (mis. local_infile
+# dimatikan): upload berikutnya langsung memakai multi-row INSERT
+_LOAD_DATA_UNAVAILABLE = set()
+
+def _build_upsert_query(table_name, columns, source=None):
+    """
+    Build INSERT ... ON DUPLICATE KEY UPDATE query, from VALUES placeholders
+    or from a SELECT on a staging table
+    """
+    column_list = ', '.join([f"`{col}`" for col in columns])
+    update_part = ', '.join([f"`{col}` = VALUES(`{col}`)" for col in columns if col not in ['DateId', 'Cell']])
+    
+    if source is None:
+        placeholders = ', '.join(['%s'] * len(columns))
+        values_part = f"VALUES ({placeholders})"
+    else:
+        values_part = f"SELECT {column_list} FROM `{source}`"
+    
+    return f"""
+        INSERT INTO `{table_name}` ({column_list})
+        {values_part}
+        ON DUPLICATE KEY UPDATE {update_part}
+        """
+
+def _upload_batches_insert(df_upload, engine, table_name, batch_size):
+    """
+    Upload with multi-row INSERT batches, commit per batch.
+    Yields number of rows of every committed batch.
+    """
+    query = _build_upsert_query(table_name, df_upload.columns.tolist())
+    
+    # NaN -> None agar dikirim sebagai NULL
+    df_values = df_upload.astype(object).where(df_upload.notna(), None)
+    
+    for start in range(0, len(df_values), batch_size):
+        batch = df_values.iloc[start:start + batch_size]
+        data_tuples = list(batch.itertuples(index=False, name=None))
+        
+        with engine.begin() as conn:
+            cursor = conn.connection.cursor()
+            try:
+                # PyMySQL menggabungkan executemany INSERT menjadi multi-row INSERT
+                cursor.executemany(query, data_tuples)
+            finally:
+                cursor.close()
+        
+        yield len(data_tuples)
+
+# Escape LOAD DATA (ESCAPED BY '\\' default): backslash dulu, lalu karakter kontrol
+LOAD_DATA_ESCAPES = [('\\', '\\\\'), ('\t', '\\t'), ('\n', '\\n'), ('\r', '\\r'), ('\0', '\\0')]
+
+def _load_data_text(df):
+    """
+    Batch as LOAD DATA text: tab separated lines, \\N for NULL and backslash,
+    tab, newline, carriage return and NUL in string values escaped
+    """
+    fields = []
+    for col in df.columns:
+        values = df[col]
+        text = values.astype(str)
+        if pd.api.types.is_string_dtype(values) or values.dtype == object:
+            for char, escaped in LOAD_DATA_ESCAPES:
+                text = text.str.replace(char, escaped, regex=False)
+        fields.append(text.where(values.notna(), '\\N'))
+    lines = fields[0].str.cat(fields[1:], sep='\t') if len(fields) > 1 else fields[0]
+    return '\n'.join(lines) + '\n' if len(lines) else ''
+
+def _upload_batches_load_data(df_upload, engine, table_name, batch_size):
+    """
+    Upload via LOAD DATA LOCAL INFILE into a temporary staging table, then
+    merge into the target with one upsert per batch, commit per batch.
+    The staging table copies the columns and primary key but not the
+    partitioning of the target (temporary tables cannot be partitioned).
+    Yields number of rows of every committed batch.
+    """
+    import tempfile
+    
+    columns = df_upload.columns.tolist()
+    staging_table = f"{table_name}_staging"
+    column_list = ', '.join([f"`{col}`" for col in columns])
+    merge_query = _build_upsert_query(table_name, columns, source=staging_table)
+    
+    conn = engine.raw_connection()
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{staging_table}`")
+        cursor.execute(f"CREATE TEMPORARY TABLE `{staging_table}` SELECT * FROM `{table_name}` LIMIT 0")
+        cursor.execute(f"ALTER TABLE `{staging_table}` ADD PRIMARY KEY (`DateId`, `Cell`)")
+        
+        for start in range(0, len(df_upload), batch_size):
+            batch = df_upload.iloc[start:start + batch_size]
+            
+            # \N adalah penanda NULL untuk LOAD DATA; nilai string di-escape
+            with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, newline='',
+                                             encoding='utf-8') as tmp:
+                tmp.write(_load_data_text(batch))
+                tmp_path = tmp.name
+            
+            try:
+                cursor.execute(f"DELETE FROM `{staging_table}`")
+                cursor.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE `{staging_table}` CHARACTER SET utf8mb4 "
+                    f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' ({column_list})",
+                    (tmp_path.replace('\\', '/'),)
+                )
+                cursor.execute(merge_query)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                os.remove(tmp_path)
+            
+            yield len(batch)
+    finally:
+        # Koneksi kembali ke pool: staging table juga dihapus saat upload gagal
+        if cursor is not None:
+            try:
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS `{staging_table}`")
+                cursor.close()
+            except Exception as e:
+                print(f"[WARNING] Gagal menghapus staging table {staging_table}: {str(e)}")
+        conn.close()
+
+def compute_upload_delta(df_upload, engine, table_name):
+    """
+    Compare prepared upload rows with rows already in the database for the same
+    DateId range. Returns (rows to send, counts dict with inserted/updated/unchanged).
+    """
+    key_cols = ['DateId', 'Cell']
+    value_cols = [col for col in df_upload.columns if col not in key_cols]
+    numeric_cols = ['Distr50', 'Distr80', 'Distr90', 'Distr95', 'Distr100', 'TotSample', 'Sector']
+    
+    # Ambil data existing untuk rentang DateId yang terdampak sekaligus
+    column_list = ', '.join([f"`{col}`" for col in df_upload.columns])
+    query = text(f"SELECT {column_list} FROM `{table_name}` WHERE DateId BETWEEN :from_date AND :to_date")
+    with engine.connect() as conn:
+        existing = pd.read_sql(query, conn, params={
+            'from_date': df_upload['DateId'].min(),
+            'to_date': df_upload['DateId'].max(),
+        })
+    existing['DateId'] = pd.to_datetime(existing['DateId']).dt.strftime('%Y-%m-%d')
+    
+    merged = df_upload.merge(existing, on=key_cols, how='left', suffixes=('', '_db'), indicator=True)
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    
+    # Bandingkan nilai; angka dibulatkan 2 desimal seperti DECIMAL(10,2), NULL == NULL
+    changed = np.zeros(len(merged), dtype=bool)
+    for col in value_cols:
+        new_values = merged[col]
+        db_values = merged[f"{col}_db"]
+        if col in numeric_cols:
+            new_values = pd.to_numeric(new_values, errors='coerce').round(2)
+            db_values = pd.to_numeric(db_values, errors='coerce').round(2)
+        else:
+            new_values = new_values.astype(str).where(new_values.notna(), None)
+            db_values = db_values.astype(str).where(db_values.notna(), None)
+        same = (new_values == db_values) | (new_values.isna() & db_values.isna())
+        changed |= ~same.to_numpy(dtype=bool)
+    
+    is_update = changed & ~is_new
+    counts = {
+        'inserted': int(is_new.sum()),
+        'updated': int(is_update.sum()),
+        'unchanged': int((~is_new & ~is_update).sum()),
+    }
+    send_mask = is_new | is_update
+    return df_upload.loc[send_mask].reset_index(drop=True), counts
+
+def upload_to_database(df, engine, batch_size=DEFAULT_UPLOAD_BATCH_SIZE, method='auto', delta=False,
+                       on_batch=None, cancel_event=None):
+    """
+    Upload dataframe to database using INSERT ON DUPLICATE KEY UPDATE in batches.
+    method: 'load_data' (LOAD DATA LOCAL INFILE + staging table), 'insert'
+    (multi-row INSERT batches) or 'auto' (load_data, fallback to insert).
+    With delta=True only new rows and rows with changed values are sent.
+    on_batch(rows) is called after every committed batch (and with the
+    unchanged rows skipped by delta upload). If cancel_event is set, upload
+    stops after the current batch and False is returned.
+    """
     try:
         if df.empty:
             try:
@@ -142,8 +354,8 @@ def upload_to_database(df, engine):
                 pass
             return False
             
-        # Prepare data for upload
-        df_upload = df.copy()
+        # Prepare data for upload (category/Float32 -> tipe biasa)
+        df_upload = to_plain_frame(df)
         
         # Convert data types
         df_upload['DateId'] = pd.to_datetime(df_upload['DateId']).dt.strftime('%Y-%m-%d')
@@ -156,59 +368,84 @@ def upload_to_database(df, engine):
         for col in numeric_cols:
             df_upload[col] = pd.to_numeric(df_upload[col], errors='coerce')
         
-        try:
-            print(f"[INFO] Memulai upload {len(df_upload)} baris ke database...")
-        except (OSError, IOError):
-            pass
-        
-        # Build INSERT ON DUPLICATE KEY UPDATE query
         table_name = DB_CONFIG['table']
-        columns = df_upload.columns.tolist()
-        
-        # Create placeholders for values
-        placeholders = ', '.join(['%s'] * len(columns))
-        
-        # Create column list for INSERT
-        column_list = ', '.join([f"`{col}`" for col in columns])
-        
-        # Create UPDATE part for ON DUPLICATE KEY
-        update_part = ', '.join([f"`{col}` = VALUES(`{col}`)" for col in columns if col not in ['DateId', 'Cell']])
-        
-        # Final query
-        query = f"""
-        INSERT INTO `{table_name}` ({column_list})
-        VALUES ({placeholders})
-        ON DUPLICATE KEY UPDATE {update_part}
-        """
-        
-        # Convert DataFrame to list of tuples
-        data_tuples = [tuple(row) for row in df_upload.values]
         
-        # Execute batch insert
-        with engine.begin() as conn:
-            # Use raw connection for batch insert
-            raw_conn = conn.connection
-            cursor = raw_conn.cursor()
-            
+        # Delta upload: hanya kirim baris baru dan baris yang berubah
+        if delta:
+            df_upload, counts = compute_upload_delta(df_upload, engine, table_name)
             try:
-                cursor.executemany(query, data_tuples)
-                affected_rows = cursor.rowcount
-                
+                print(f"[INFO] Delta upload: {counts['inserted']} baru, {counts['updated']} berubah, "
+                      f"{counts['unchanged']} tidak berubah")
+            except (OSError, IOError):
+                pass
+            if on_batch and counts['unchanged']:
+                on_batch(counts['unchanged'])
+            if df_upload.empty:
                 try:
-                    print(f"[SUCCESS] Upload berhasil! {affected_rows} baris diproses")
+                    print("[SUCCESS] Tidak ada perubahan data untuk diupload")
                 except (OSError, IOError):
                     pass
-                    
                 return True
+        
+        total_rows = len(df_upload)
+        total_batches = (total_rows + batch_size - 1) // batch_size
+        try:
+            print(f"[INFO] Memulai upload {total_rows} baris ke database ({total_batches} batch)...")
+        except (OSError, IOError):
+            pass
+        
+        uploaders = {
+            'load_data': _upload_batches_load_data,
+            'insert': _upload_batches_insert,
+        }
+        methods = ['load_data', 'insert'] if method == 'auto' else [method]
+        engine_key = str(getattr(engine, 'url', id(engine)))
+        if method == 'auto' and engine_key in _LOAD_DATA_UNAVAILABLE:
+            methods = ['insert']
+        
+        uploaded_rows = 0
+        for current_method in methods:
+            try:
+                batch_number = 0
+                for batch_rows in uploaders[current_method](df_upload.iloc[uploaded_rows:], engine,
+                                                            table_name, batch_size):
+                    batch_number += 1
+                    uploaded_rows += batch_rows
+                    if on_batch:
+                        on_batch(batch_rows)
+                    if cancel_event is not None and cancel_event.is_set() and uploaded_rows < total_rows:
+                        try:
+                            print(f"[INFO] Upload dibatalkan setelah {uploaded_rows}/{total_rows} baris")
+                        except (OSError, IOError):
+                            pass
+                        return False
+                    try:
+                        print(f"[INFO] Batch {batch_number} ({current_method}) committed: "
+                              f"{uploaded_rows}/{total_rows} baris")
+                    except (OSError, IOError):
+                        pass
+                break
                 
             except Exception as e:
+                if current_method == methods[-1]:
+                    try:
+                        print(f"[ERROR] Gagal upload ke database: {str(e)}")
+                    except (OSError, IOError):
+                        pass
+                    return False
+                if current_method == 'load_data' and batch_number == 0:
+                    # Gagal sebelum batch pertama: jangan dicoba lagi pada upload berikutnya
+                    _LOAD_DATA_UNAVAILABLE.add(engine_key)
                 try:
-                    print(f"[ERROR] Gagal upload ke database: {str(e)}")
+                    print(f"[WARNING] {current_method} gagal ({str(e)}), lanjut dengan multi-row INSERT")
                 except (OSError, IOError):
                     pass
-                return False
-            finally:
-                cursor.close()
+        
+        try:
+            print(f"[SUCCESS] Upload berhasil! {uploaded_rows} baris diproses")
+        except (OSError, IOError):
+            pass
+        return True
                 
     except Exception as e:
         try:
@@ -217,6 +454,301 @@ def upload_to_database(df, engine):
             pass
         return False
 
+# Jumlah baris per batch DELETE (setiap batch di-commit sendiri)
+DEFAULT_DELETE_BATCH_SIZE = 10000
+SITEID_INDEX_NAME = "idx_siteid"
+
+def has_siteid_index(engine, table_name):
+    """True if an index starts with SiteId"""
+    with engine.connect() as conn:
+        return bool(conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+            "AND COLUMN_NAME = 'SiteId' AND SEQ_IN_INDEX = 1"
+        ), {'table': table_name}).scalar())
+
+def ensure_siteid_index(engine, table_name):
+    """
+    Create index on SiteId if the table has none (needed for fast delete by
+    site). This is a schema change (online ALTER TABLE); only run on request.
+    """
+    if has_siteid_index(engine, table_name):
+        return False
+    
+    print(f"[INFO] Membuat index {SITEID_INDEX_NAME} pada {table_name}(SiteId)...")
+    with engine.begin() as conn:
+        # Online DDL: tabel tetap bisa dibaca/ditulis selama index dibuat
+        conn.execute(text(f"ALTER TABLE `{table_name}` ADD INDEX `{SITEID_INDEX_NAME}` (`SiteId`), "
+                          f"ALGORITHM=INPLACE, LOCK=NONE"))
+    return True
+
+def get_date_partitions(engine, table_name):
+    """
+    RANGE partitions of the table on DateId as list of
+    (name, upper bound date exclusive or None for MAXVALUE, row estimate)
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "AND PARTITION_METHOD LIKE 'RANGE%' ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {'table': table_name}).fetchall()
+        
+        partitions = []
+        for name, description, table_rows in rows:
+            if description is None or description.upper() == 'MAXVALUE':
+                partitions.append((name, None, table_rows or 0))
+                continue
+            # Batas partisi berupa TO_DAYS('YYYY-MM-DD') atau tanggal langsung
+            bound = conn.execute(text(f"SELECT FROM_DAYS({description})" if description.lstrip('-').isdigit()
+                                      else f"SELECT DATE({description})")).scalar()
+            partitions.append((name, pd.Timestamp(bound).date(), table_rows or 0))
+    return partitions
+
+def _delete_in_batches(engine, table_name, where, params, batch_size, cancel_event, on_progress):
+    """Repeat DELETE ... ORDER BY primary key LIMIT batch_size, commit per batch"""
+    deleted = 0
+    query = text(f"DELETE FROM `{table_name}` WHERE {where} ORDER BY DateId, Cell LIMIT {int(batch_size)}")
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            return deleted, True
+        with engine.begin() as conn:
+            rowcount = conn.execute(query, params).rowcount
+        deleted += rowcount
+        if on_progress:
+            on_progress(rowcount)
+        if rowcount < batch_size:
+            return deleted, False
+
+def clear_database(engine, option, from_date=None, to_date=None, site_id=None,
+                   batch_size=DEFAULT_DELETE_BATCH_SIZE, cancel_event=None, progress_callback=None,
+                   table_name=None, create_index=False):
+    """
+    Delete rows from tainit_cell_day without one huge transaction.
+    option 'all' uses TRUNCATE. option 'date' truncates DateId partitions fully
+    inside the range and deletes the rest in primary-key ordered batches; it
+    never touches rows outside the range, even ones inserted meanwhile.
+    option 'site' deletes in batches; with create_index=True a missing SiteId
+    index is created first (ensure_siteid_index), otherwise only a warning is
+    printed. Every batch is committed on its own and cancel_event is checked
+    between batches.
+    progress_callback(deleted_rows, total_rows) is called after each step.
+    Returns dict: deleted, total, method, cancelled, approximate.
+    """
+    table_name = table_name or DB_ADMIN_CONFIG['table']
+    result = {'deleted': 0, 'total': 0, 'method': 'batch', 'cancelled': False, 'approximate': False}
+    
+    def report(rows):
+        result['deleted'] += rows
+        if progress_callback:
+            progress_callback(result['deleted'], result['total'])
+    
+    def count(where, params):
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM `{table_name}` WHERE {where}"), params).scalar()
+    
+    def truncate_table():
+        # Jumlah baris dari statistik tabel (COUNT(*) pada tabel besar terlalu lama)
+        with engine.connect() as conn:
+            estimate = conn.execute(text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+            ), {'table': table_name}).scalar() or 0
+        result.update(total=estimate, method='truncate', approximate=True)
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE TABLE `{table_name}`"))
+        report(estimate)
+        return result
+    
+    if option == 'all':
+        return truncate_table()
+    
+    if option == 'date':
+        start, end = pd.Timestamp(from_date).date(), pd.Timestamp(to_date).date()
+        where = "DateId BETWEEN :from_date AND :to_date"
+        params = {'from_date': start.isoformat(), 'to_date': end.isoformat()}
+        result['total'] = count(where, params)
+        
+        # Partisi yang seluruh rentangnya di dalam [from_date, to_date] dikosongkan langsung
+        full_partitions = []
+        lower = None
+        for name, upper, _ in get_date_partitions(engine, table_name):
+            if lower is not None and upper is not None and start <= lower and upper - timedelta(days=1) <= end:
+                full_partitions.append((name, lower, upper))
+            lower = upper
+        for name, part_start, part_end in full_partitions:
+            if cancel_event is not None and cancel_event.is_set():
+                result['cancelled'] = True
+                return result
+            part_params = {'from_date': part_start.isoformat(),
+                           'to_date': (part_end - timedelta(days=1)).isoformat()}
+            rows = count(where, part_params)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE `{table_name}` TRUNCATE PARTITION `{name}`"))
+            result['method'] = 'partition'
+            report(rows)
+        
+        # Sisa baris (di luar partisi penuh) dihapus per batch
+        _, result['cancelled'] = _delete_in_batches(engine, table_name, where, params,
+                                                    batch_size, cancel_event, report)
+        return result
+    
+    if option == 'site':
+        if create_index:
+            ensure_siteid_index(engine, table_name)
+        elif not has_siteid_index(engine, table_name):
+            print(f"[WARNING] {table_name} tidak punya index SiteId: setiap batch delete memindai tabel "
+                  f"(buat index dengan ensure_siteid_index / create_index=True)")
+        where = "SiteId = :site_id"
+        params = {'site_id': site_id}
+        result['total'] = count(where, params)
+        _, result['cancelled'] = _delete_in_batches(engine, table_name, where, params,
+                                                    batch_size, cancel_event, report)
+        return result
+    
+    raise ValueError(f"Opsi clear tidak dikenal: {option}")
+
+# Partisi RANGE COLUMNS(DateId): per bulan ('month') atau per hari ('day'),
+# dengan partisi MAXVALUE di akhir dan beberapa periode ke depan yang sudah dibuat
+PARTITION_SCHEME = 'month'
+PARTITIONS_AHEAD = 3
+FUTURE_PARTITION = 'pfuture'
+
+def _next_period(day, scheme):
+    if scheme == 'day':
+        return day + timedelta(days=1)
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def _period_start(day, scheme):
+    return day if scheme == 'day' else day.replace(day=1)
+
+def partition_name(period_start, scheme=PARTITION_SCHEME):
+    """Partition name for a period: p202501 (month) or p20250101 (day)"""
+    return period_start.strftime("p%Y%m%d" if scheme == 'day' else "p%Y%m")
+
+def partition_definitions(first_day, last_day, scheme=PARTITION_SCHEME):
+    """
+    Partition definitions for every period from first_day to last_day
+    (inclusive) as list of (name, upper bound exclusive)
+    """
+    definitions = []
+    period = _period_start(first_day, scheme)
+    while period <= last_day:
+        upper = _next_period(period, scheme)
+        definitions.append((partition_name(period, scheme), upper))
+        period = upper
+    return definitions
+
+def _partition_sql(definitions, maxvalue_name=FUTURE_PARTITION):
+    parts = [f"PARTITION `{name}` VALUES LESS THAN ('{upper.isoformat()}')" for name, upper in definitions]
+    if maxvalue_name:
+        parts.append(f"PARTITION `{maxvalue_name}` VALUES LESS THAN (MAXVALUE)")
+    return ', '.join(parts)
+
+def partition_table(engine, table_name=None, scheme=PARTITION_SCHEME, ahead=PARTITIONS_AHEAD):
+    """
+    Convert table to RANGE COLUMNS(DateId) partitions, one per month/day from
+    the oldest DateId up to `ahead` periods after today. This rebuilds the
+    table once (can take long on a big table); returns False if already partitioned.
+    """
+    table_name = table_name or DB_ADMIN_CONFIG['table']
+    if get_date_partitions(engine, table_name):
+        print(f"[INFO] Tabel {table_name} sudah dipartisi")
+        return False
+    
+    with engine.connect() as conn:
+        min_date = conn.execute(text(f"SELECT MIN(DateId) FROM `{table_name}`")).scalar()
+    today = datetime.now().date()
+    first_day = pd.Timestamp(min_date).date() if min_date is not None else today
+    last_day = today
+    for _ in range(ahead):
+        last_day = _next_period(_period_start(last_day, scheme), scheme)
+    definitions = partition_definitions(first_day, last_day, scheme)
+    
+    print(f"[INFO] Membuat {len(definitions)} partisi DateId ({scheme}) pada {table_name}...")
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE `{table_name}` PARTITION BY RANGE COLUMNS(DateId) "
+                          f"({_partition_sql(definitions)})"))
+    return True
+
+def ensure_future_partitions(engine, table_name=None, scheme=PARTITION_SCHEME, ahead=PARTITIONS_AHEAD):
+    """
+    Make sure partitions exist up to `ahead` periods after today by splitting
+    the MAXVALUE partition. Does nothing if the table is not partitioned, and
+    skips with a warning if the MAXVALUE partition holds rows (REORGANIZE
+    would then copy them). Returns names of the partitions added.
+    """
+    table_name = table_name or DB_ADMIN_CONFIG['table']
+    partitions = get_date_partitions(engine, table_name)
+    bounded = [upper for _, upper, _ in partitions if upper is not None]
+    if not bounded:
+        return []
+    
+    target = datetime.now().date()
+    for _ in range(ahead):
+        target = _next_period(_period_start(target, scheme), scheme)
+    definitions = partition_definitions(max(bounded), target - timedelta(days=1), scheme)
+    if not definitions:
+        return []
+    
+    # REORGANIZE hanya jika partisi MAXVALUE kosong (tidak ada data yang dipindahkan);
+    # tanpa partisi MAXVALUE cukup ADD PARTITION
+    if partitions[-1][1] is None:
+        future_name, _, future_rows = partitions[-1]
+        if not future_rows:
+            with engine.connect() as conn:
+                future_rows = conn.execute(text(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM `{table_name}` PARTITION (`{future_name}`) LIMIT 1) t"
+                )).scalar()
+        if future_rows:
+            print(f"[WARNING] Partisi {future_name} tidak kosong, partisi baru tidak ditambahkan "
+                  f"(pindahkan data atau REORGANIZE manual di luar jam sibuk)")
+            return []
+        statement = (f"REORGANIZE PARTITION `{partitions[-1][0]}` "
+                     f"INTO ({_partition_sql(definitions, maxvalue_name=partitions[-1][0])})")
+    else:
+        statement = f"ADD PARTITION ({_partition_sql(definitions, maxvalue_name=None)})"
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE `{table_name}` {statement}"))
+    names = [name for name, _ in definitions]
+    print(f"[INFO] Partisi baru ditambahkan: {', '.join(names)}")
+    return names
+
+def drop_partitions_before(engine, cutoff_date, table_name=None):
+    """
+    Retention: drop partitions whose whole range is before cutoff_date
+    (instant, no row-by-row delete). Returns (dropped names, estimated rows).
+    """
+    table_name = table_name or DB_ADMIN_CONFIG['table']
+    cutoff = pd.Timestamp(cutoff_date).date()
+    expired = [(name, rows) for name, upper, rows in get_date_partitions(engine, table_name)
+               if upper is not None and upper <= cutoff]
+    if not expired:
+        return [], 0
+    
+    names = [name for name, _ in expired]
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE `{table_name}` DROP PARTITION {', '.join(f'`{n}`' for n in names)}"))
+    rows = sum(rows for _, rows in expired)
+    print(f"[INFO] Retensi: partisi {', '.join(names)} dihapus (±{rows} baris)")
+    return names, rows
+
+def maintain_partitions():
+    """
+    Add upcoming DateId partitions (admin connection). Not part of a normal
+    run: call it from a scheduled job (ta_cli.py --maintain-partitions).
+    Failures are reported as warning; returns False if it failed.
+    """
+    try:
+        engine = create_admin_db_connection()
+        if engine is None:
+            return False
+        ensure_future_partitions(engine)
+        return True
+    except Exception as e:
+        print(f"[WARNING] Gagal menambah partisi DateId: {str(e)}")
+        return False
+
 def get_sector(cellname):
     """
     Extract sector from cell name
@@ -309,31 +841,284 @@ def get_ne_id(cellname):
     except:
         return 'UNKNOWN'
 
+def get_sector_vectorized(cellnames):
+    """
+    Vectorized get_sector for a Series of cell names (string)
+    """
+    last_char = cellnames.str[-1]
+    is_digit = last_char.str.isdecimal().fillna(False).astype(bool)
+    return last_char.where(is_digit, '0').astype(np.int64)
+
+def get_band_vectorized(neids, siteids):
+    """
+    Vectorized get_band for Series of NE ID and Site ID
+    """
+    conditions = [
+        neids.str.contains('1800', regex=False) | siteids.str.contains('18', regex=False),
+        neids.str.contains('900', regex=False) | siteids.str.contains('9', regex=False),
+        neids.str.contains('2100', regex=False) | siteids.str.contains('21', regex=False),
+    ]
+    bands = np.select(conditions, ['1800', '900', '2100'], default='1800')
+    return pd.Series(bands, index=neids.index, dtype=object)
+
+def get_site_id_vectorized(erbs_names):
+    """
+    Vectorized get_site_id for a Series of ERBS names (string)
+    """
+    site_ids = erbs_names.str.partition('_')[0]
+    site_ids = site_ids.str.replace(r'[^A-Za-z0-9]', '', regex=True).str[:20]
+    return site_ids.where(site_ids != '', 'UNKNOWN')
+
+def get_site_name_vectorized(erbs_names):
+    """
+    Vectorized get_site_name for a Series of ERBS names (string)
+    """
+    site_names = erbs_names.str.replace('_', ' ', regex=False).str.title().str[:50]
+    return site_names.where(site_names != '', 'UNKNOWN')
+
+def get_ne_id_vectorized(cellnames):
+    """
+    Vectorized get_ne_id for a Series of cell names (string)
+    """
+    has_underscore = cellnames.str.contains('_', regex=False)
+    ne_ids = cellnames.str.partition('_')[0].where(has_underscore, cellnames.str[:-1])
+    ne_ids = ne_ids.str.replace(r'[^A-Za-z0-9]', '', regex=True).str[:20]
+    return ne_ids.where(ne_ids != '', 'UNKNOWN')
+
+# Atribut site/cell yang diturunkan dari (ERBS, EUtranCellFDD)
+CELL_ATTRIBUTE_COLS = ['SiteId', 'SiteName', 'Sector', 'Band', 'NeId']
+
+def derive_cell_attributes(erbs_names, cell_names):
+    """
+    Derive SiteId, SiteName, Sector, Band and NeId for Series of ERBS and
+    cell names (string). Returns DataFrame with CELL_ATTRIBUTE_COLS.
+    """
+    site_ids = get_site_id_vectorized(erbs_names)
+    ne_ids = get_ne_id_vectorized(cell_names)
+    return pd.DataFrame({
+        'SiteId': site_ids.to_numpy(),
+        'SiteName': get_site_name_vectorized(erbs_names).to_numpy(),
+        'Sector': get_sector_vectorized(cell_names).to_numpy(),
+        'Band': get_band_vectorized(ne_ids, site_ids).to_numpy(),
+        'NeId': ne_ids.to_numpy(),
+    }, index=erbs_names.index)
+
+# Cache dimensi cell (SQLite) agar atribut hanya diturunkan untuk cell baru.
+# Naikkan versi jika aturan penurunan berubah di luar fungsi *_vectorized.
+CELL_CACHE_FILENAME = "ta_cell_dimension.sqlite"
+CELL_CACHE_VERSION = 1
+_CELL_CACHES = {}
+_CELL_CACHES_LOCK = threading.Lock()
+
+def _hash_code(digest, code):
+    """Add bytecode and constants of a function (recursively) to digest"""
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _hash_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+def cell_rules_hash():
+    """
+    Fingerprint of the attribute derivation rules; the cache is invalidated
+    when any derivation function or CELL_CACHE_VERSION changes
+    """
+    digest = hashlib.sha256(str(CELL_CACHE_VERSION).encode())
+    for func in (derive_cell_attributes, get_site_id_vectorized, get_site_name_vectorized,
+                 get_sector_vectorized, get_ne_id_vectorized, get_band_vectorized):
+        _hash_code(digest, func.__code__)
+    return digest.hexdigest()
+
+def get_cell_cache_path(output_dir=None):
+    """Path of the cell-dimension cache, stored in the output folder"""
+    return os.path.join(output_dir or DEFAULT_OUTPUT_PATH, CELL_CACHE_FILENAME)
+
+class CellDimensionCache:
+    """
+    Derived site attributes keyed by (ERBS, EUtranCellFDD), persisted in SQLite.
+    lookup() derives attributes only for keys not seen before; save() writes
+    the new keys to disk. Entries from other derivation rules are discarded on load.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.rules_hash = cell_rules_hash()
+        self.frame = pd.DataFrame(columns=CELL_ATTRIBUTE_COLS,
+                                  index=pd.MultiIndex.from_arrays([[], []], names=['ERBS', 'Cell']))
+        self._pending = []
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cell_dimension (
+                erbs TEXT,
+                cell TEXT,
+                site_id TEXT,
+                site_name TEXT,
+                sector INTEGER,
+                band TEXT,
+                ne_id TEXT,
+                PRIMARY KEY (erbs, cell)
+            )
+        """)
+        return conn
+    
+    def _load(self):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM cache_meta WHERE key = 'rules_hash'").fetchone()
+            if row is None or row[0] != self.rules_hash:
+                # Aturan penurunan berubah: cache lama tidak berlaku
+                if row is not None:
+                    print("[INFO] Aturan atribut cell berubah, cache dimensi cell dibuat ulang")
+                conn.execute("DELETE FROM cell_dimension")
+                conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('rules_hash', ?)",
+                             (self.rules_hash,))
+                conn.commit()
+                return
+            
+            cached = pd.read_sql_query(
+                "SELECT erbs AS ERBS, cell AS Cell, site_id AS SiteId, site_name AS SiteName, "
+                "sector AS Sector, band AS Band, ne_id AS NeId FROM cell_dimension", conn
+            )
+        finally:
+            conn.close()
+        
+        if not cached.empty:
+            cached['Sector'] = cached['Sector'].astype(np.int64)
+            self.frame = cached.set_index(['ERBS', 'Cell'])
+    
+    def lookup(self, erbs_names, cell_names):
+        """
+        Return CELL_ATTRIBUTE_COLS for Series of ERBS and cell names (string),
+        aligned to their index
+        """
+        keys = pd.MultiIndex.from_arrays([erbs_names.to_numpy(), cell_names.to_numpy()],
+                                         names=['ERBS', 'Cell'])
+        with self._lock:
+            unique_keys = keys.unique()
+            missing = unique_keys[~unique_keys.isin(self.frame.index)]
+            if len(missing):
+                new_erbs = pd.Series(missing.get_level_values(0), dtype=object)
+                new_cells = pd.Series(missing.get_level_values(1), dtype=object)
+                derived = derive_cell_attributes(new_erbs, new_cells)
+                derived.index = missing
+                self.frame = derived if self.frame.empty else pd.concat([self.frame, derived])
+                self._pending.append(derived)
+            attributes = self.frame.reindex(keys)
+        
+        attributes.index = erbs_names.index
+        return attributes
+    
+    def save(self):
+        """Write attributes derived since the last save to disk"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending = pd.concat(self._pending)
+            self._pending = []
+        
+        rows = [(erbs, cell, site_id, site_name, int(sector), band, ne_id)
+                for (erbs, cell), site_id, site_name, sector, band, ne_id
+                in zip(pending.index, *(pending[col] for col in CELL_ATTRIBUTE_COLS))]
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM cache_meta WHERE key = 'rules_hash'").fetchone()
+            if row is not None and row[0] != self.rules_hash:
+                # Cache di disk sudah ditulis oleh versi aturan lain
+                return 0
+            conn.executemany(
+                "INSERT OR REPLACE INTO cell_dimension "
+                "(erbs, cell, site_id, site_name, sector, band, ne_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+def get_cell_cache(path=None):
+    """Return the cell-dimension cache for a path (one instance per process)"""
+    path = os.path.abspath(path or get_cell_cache_path())
+    with _CELL_CACHES_LOCK:
+        cache = _CELL_CACHES.get(path)
+        if cache is None:
+            cache = CellDimensionCache(path)
+            _CELL_CACHES[path] = cache
+        return cache
+
+# Kolom distribusi TA (histogram 35 bin) dan level persentil yang dihitung
+TA_DISTR_COLS = [f'pmTaInit2Distr_{i:02d}' for i in range(35)]
+PERCENTILE_LEVELS = [('Distr50', 50), ('Distr80', 80), ('Distr90', 90), ('Distr95', 95), ('Distr100', 100)]
+
+def build_distr_count_matrix(df):
+    """
+    Build 2-D count matrix (rows x 35) from pmTaInit2Distr_00..34 columns.
+    Missing columns, '\\N', non-numeric and negative values count as 0.
+    """
+    counts = np.zeros((len(df), len(TA_DISTR_COLS)), dtype=np.int64)
+    for i, col in enumerate(TA_DISTR_COLS):
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        # Sama seperti int(float(value)): dibulatkan ke bawah menuju nol
+        values = np.trunc(values)
+        valid = np.isfinite(values) & (values > 0)
+        counts[valid, i] = values[valid].astype(np.int64)
+    return counts
+
+def calculate_percentiles_vectorized(counts):
+    """
+    Calculate TA percentiles for all rows at once from a histogram count matrix.
+    Same result as np.percentile (linear) on the expanded samples, without expanding them.
+    Returns dict of arrays: Distr50..Distr100 (float64, NaN if no sample) and TotSample (int64).
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    if counts.ndim == 1:
+        counts = counts.reshape(1, -1)
+
+    cum = np.cumsum(counts, axis=1)
+    total = cum[:, -1]
+    has_sample = total > 0
+    last_index = np.maximum(total - 1, 0)
+
+    def value_at(sample_index):
+        # Nilai sampel ke-k (terurut) = jumlah bin yang kumulatifnya <= k
+        return (cum <= sample_index[:, None]).sum(axis=1).astype(np.float64)
+
+    result = {}
+    for name, q in PERCENTILE_LEVELS:
+        # Mengikuti np.percentile method='linear': virtual index = (n - 1) * q
+        virtual = last_index * (q / 100)
+        previous = np.floor(virtual)
+        gamma = virtual - previous
+        previous = previous.astype(np.int64)
+        following = np.minimum(previous + 1, last_index)
+
+        a = value_at(previous)
+        b = value_at(following)
+        diff = b - a
+        value = np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+
+        result[name] = np.where(has_sample, np.round(value, 2), np.nan)
+
+    result['TotSample'] = total
+    return result
+
 def calculate_percentiles_safe(row):
     """
     Calculate percentiles from TA distribution data safely
     """
     try:
-        # Kolom distribusi TA
-        distr_cols = [f'pmTaInit2Distr_{i:02d}' for i in range(35)]
-        
-        # Ambil data distribusi
-        distr_data = []
-        total_samples = 0
-        
-        for i, col in enumerate(distr_cols):
-            if col in row:
-                value = row[col]
-                if pd.notna(value) and value != '\\N':
-                    try:
-                        count = int(float(value))
-                        if count > 0:
-                            distr_data.extend([i] * count)
-                            total_samples += count
-                    except:
-                        continue
-        
-        if not distr_data or total_samples == 0:
+        counts = build_distr_count_matrix(pd.DataFrame([row]))
+        percentiles = calculate_percentiles_vectorized(counts)
+
+        if percentiles['TotSample'][0] == 0:
             return {
                 'Distr50': '\\N',
                 'Distr80': '\\N', 
@@ -342,24 +1127,10 @@ def calculate_percentiles_safe(row):
                 'Distr100': '\\N',
                 'TotSample': 0
             }
-        
-        # Calculate percentiles
-        distr_array = np.array(distr_data)
-        
-        p50 = np.percentile(distr_array, 50)
-        p80 = np.percentile(distr_array, 80)
-        p90 = np.percentile(distr_array, 90)
-        p95 = np.percentile(distr_array, 95)
-        p100 = np.percentile(distr_array, 100)
-        
-        return {
-            'Distr50': round(p50, 2),
-            'Distr80': round(p80, 2),
-            'Distr90': round(p90, 2),
-            'Distr95': round(p95, 2),
-            'Distr100': round(p100, 2),
-            'TotSample': total_samples
-        }
+
+        result = {name: percentiles[name][0] for name, _ in PERCENTILE_LEVELS}
+        result['TotSample'] = int(percentiles['TotSample'][0])
+        return result
         
     except Exception as e:
         return {
@@ -371,16 +1142,71 @@ def calculate_percentiles_safe(row):
             'TotSample': 0
         }
 
-def process_ericsson_data(df):
+# Skema frame hasil proses: string sebagai category, persentil Float32 dengan NA asli.
+# '\\N' hanya dipakai saat menulis CSV/database.
+PROCESSED_CATEGORY_COLS = ['DateId', 'Cell', 'SiteId', 'SiteName', 'Band', 'NeId']
+# Histogram TA mentah (aditif antar hari), ikut di frame hasil jika histogram=True
+HISTOGRAM_COLS = [f'Bin{i:02d}' for i in range(len(TA_DISTR_COLS))]
+
+def _smallest_int_dtype(values):
+    """Smallest signed integer dtype (int8..int64) that holds all values"""
+    if len(values) == 0:
+        return np.int8
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+def concat_processed_frames(frames):
+    """
+    Concatenate processed frames keeping category columns categorical
+    (categories are unioned instead of falling back to object)
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) == 1:
+        return frames[0]
+    result = pd.concat(frames, ignore_index=True)
+    for col in PROCESSED_CATEGORY_COLS:
+        if col in result.columns and not isinstance(result[col].dtype, pd.CategoricalDtype):
+            parts = [frame[col] for frame in frames if col in frame.columns]
+            if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+                result[col] = pd.Series(union_categoricals(parts), index=result.index)
+    return result
+
+def to_plain_frame(df):
+    """
+    Convert processed frame to plain column types for the database edge:
+    category -> string values, percentiles -> float64 (NaN for NA), int64 integers
+    """
+    plain = df.copy()
+    for col in plain.columns:
+        if isinstance(plain[col].dtype, pd.CategoricalDtype):
+            plain[col] = plain[col].astype(str)
+    for name, _ in PERCENTILE_LEVELS:
+        if name in plain.columns:
+            # Float32 -> float64 dibulatkan ulang agar nilai persis seperti 2 desimal
+            plain[name] = pd.to_numeric(plain[name], errors='coerce').astype('float64').round(2)
+    for col in ('Sector', 'TotSample'):
+        if col in plain.columns:
+            plain[col] = pd.to_numeric(plain[col], errors='coerce').astype('int64')
+    return plain
+
+def process_ericsson_data(df, cell_cache=None, histogram=False):
     """
-    Process Ericsson CSV data and calculate TA percentiles
+    Process Ericsson CSV data and calculate TA percentiles.
+    With a CellDimensionCache, site attributes are only derived for new cells.
+    Returns compact frame: category strings, int8 Sector, smallest int TotSample
+    and Float32 percentiles with NA where there is no sample. With
+    histogram=True the raw counts are kept as uint32 columns Bin00..Bin34.
     """
     try:
         print("[INFO] Memulai pemrosesan data Ericsson...")
         
         # Validasi kolom yang diperlukan
         required_cols = ['DATE_ID', 'ERBS', 'EUtranCellFDD']
-        distr_cols = [f'pmTaInit2Distr_{i:02d}' for i in range(35)]
+        distr_cols = TA_DISTR_COLS
         
         missing_cols = []
         for col in required_cols:
@@ -396,51 +1222,48 @@ def process_ericsson_data(df):
         if len(available_distr_cols) < 10:  # Minimal 10 kolom distribusi
             print(f"[WARNING] Hanya {len(available_distr_cols)} kolom distribusi ditemukan")
         
-        processed_data = []
-        
-        for idx, row in df.iterrows():
-            try:
-                # Calculate percentiles
-                percentiles = calculate_percentiles_safe(row)
-                
-                # Extract site information
-                erbs_name = str(row['ERBS'])
-                cell_name = str(row['EUtranCellFDD'])
-                site_id = get_site_id(erbs_name)
-                site_name = get_site_name(erbs_name, site_id)
-                sector = get_sector(cell_name)
-                ne_id = get_ne_id(cell_name)
-                band = get_band(ne_id, site_id)
-                
-                # Create processed row
-                processed_row = {
-                    'DateId': row['DATE_ID'],
-                    'Cell': cell_name,
-                    'SiteId': site_id,
-                    'SiteName': site_name,
-                    'Sector': sector,
-                    'Band': band,
-                    'NeId': ne_id,
-                    'Distr50': percentiles['Distr50'],
-                    'Distr80': percentiles['Distr80'],
-                    'Distr90': percentiles['Distr90'],
-                    'Distr95': percentiles['Distr95'],
-                    'Distr100': percentiles['Distr100'],
-                    'TotSample': percentiles['TotSample']
-                }
-                
-                processed_data.append(processed_row)
-                
-            except Exception as e:
-                print(f"[WARNING] Error processing row {idx}: {str(e)}")
-                continue
+        # Baris tanpa DATE_ID tidak bisa diupload/dipartisi (bukan kategori 'nan')
+        missing_date = df['DATE_ID'].isna() | (df['DATE_ID'].astype(str).str.strip() == '')
+        if missing_date.any():
+            print(f"[WARNING] {int(missing_date.sum())} baris tanpa DATE_ID dilewati")
+            df = df[~missing_date]
         
-        if not processed_data:
+        if df.empty:
             print("[ERROR] Tidak ada data yang berhasil diproses")
             return None
         
-        # Create DataFrame
-        result_df = pd.DataFrame(processed_data)
+        # Hitung persentil untuk semua baris sekaligus dari matriks histogram
+        counts = build_distr_count_matrix(df)
+        percentiles_all = calculate_percentiles_vectorized(counts)
+        has_sample = percentiles_all['TotSample'] > 0
+        
+        # Extract site information (per kolom, bukan per baris)
+        erbs_names = df['ERBS'].map(str)
+        cell_names = df['EUtranCellFDD'].map(str)
+        if cell_cache is not None:
+            attributes = cell_cache.lookup(erbs_names, cell_names)
+        else:
+            attributes = derive_cell_attributes(erbs_names, cell_names)
+        
+        # Create processed frame (kolom string sebagai category)
+        total_samples = percentiles_all['TotSample']
+        result_df = pd.DataFrame({
+            'DateId': pd.Categorical(df['DATE_ID'].map(str).to_numpy()),
+            'Cell': pd.Categorical(cell_names.to_numpy()),
+            'SiteId': pd.Categorical(attributes['SiteId'].to_numpy()),
+            'SiteName': pd.Categorical(attributes['SiteName'].to_numpy()),
+            'Sector': attributes['Sector'].to_numpy().astype(np.int8),
+            'Band': pd.Categorical(attributes['Band'].to_numpy()),
+            'NeId': pd.Categorical(attributes['NeId'].to_numpy()),
+        })
+        for name, _ in PERCENTILE_LEVELS:
+            # Baris tanpa sampel menjadi NA (ditulis sebagai \N di CSV/database)
+            result_df[name] = pd.arrays.FloatingArray(percentiles_all[name].astype(np.float32), ~has_sample)
+        result_df['TotSample'] = total_samples.astype(_smallest_int_dtype(total_samples))
+        if histogram:
+            bins_dtype = np.uint32 if counts.max(initial=0) <= np.iinfo(np.uint32).max else np.int64
+            bins = pd.DataFrame(counts.astype(bins_dtype), columns=HISTOGRAM_COLS)
+            result_df = pd.concat([result_df, bins], axis=1)
         
         print(f"[SUCCESS] Berhasil memproses {len(result_df)} baris data")
         return result_df
@@ -449,187 +1272,1968 @@ def process_ericsson_data(df):
         print(f"[ERROR] Error dalam process_ericsson_data: {str(e)}")
         return None
 
-def process_ta_data(input_path, upload_to_db=True, cancel_event=None):
+# Kolom input yang dibaca dari CSV Ericsson
+REQUIRED_INPUT_COLS = ['DATE_ID', 'ERBS', 'EUtranCellFDD']
+NULL_MARKERS = ['\\N']
+
+def get_csv_engine(chunksize=None):
+    """
+    Pick fastest available CSV parser: pyarrow if installed, else C engine
+    (pyarrow engine does not support chunked reading)
+    """
+    if chunksize is None:
+        try:
+            import pyarrow  # noqa: F401
+            return 'pyarrow'
+        except ImportError:
+            pass
+    return 'c'
+
+def _counter_na_values(usecols):
+    """
+    Per-column NA markers: '\\N' and empty fields only in counter columns,
+    name columns (DATE_ID, ERBS, EUtranCellFDD) are kept exactly as written
+    """
+    return {col: NULL_MARKERS + [''] if col in TA_DISTR_COLS else [] for col in usecols}
+
+def _read_ta_csv_arrow(file_path, usecols):
+    """
+    pyarrow reader: counters as Int64 with null markers, name columns as
+    strings that are never null (the pandas pyarrow engine cannot limit
+    na_values to some columns)
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    column_types = {col: pa.int64() if col in TA_DISTR_COLS else pa.string() for col in usecols}
+    convert_options = pa_csv.ConvertOptions(include_columns=usecols, column_types=column_types,
+                                            null_values=NULL_MARKERS + [''], strings_can_be_null=False)
+    table = pa_csv.read_csv(file_path, convert_options=convert_options)
+    return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+def read_ta_csv(file_path, chunksize=None, engine=None):
     """
-    Main function to process TA data with database upload
+    Read Ericsson TA CSV with only the needed columns, '\\N' as NA in the
+    numeric counter columns and name columns as written.
+    Returns DataFrame, or iterator if chunksize set.
     """
+    if engine is None:
+        engine = get_csv_engine(chunksize)
+    
+    # Baca header saja untuk menentukan kolom yang tersedia
+    header = pd.read_csv(file_path, nrows=0).columns
+    wanted = set(REQUIRED_INPUT_COLS) | set(TA_DISTR_COLS)
+    usecols = [col for col in header if col in wanted]
+    # Counter dibaca sebagai Int64 pada pyarrow; pada C engine parsing Int64 jauh
+    # lebih lambat sehingga dipakai float64 (NA native, exact untuk nilai counter)
+    counter_dtype = 'Int64' if engine == 'pyarrow' else 'float64'
+    distr_dtypes = {col: counter_dtype for col in usecols if col in TA_DISTR_COLS}
+    
+    read_kwargs = {'usecols': usecols, 'na_values': _counter_na_values(usecols), 'keep_default_na': False}
+    if chunksize:
+        return _iter_ta_csv_chunks(file_path, distr_dtypes, read_kwargs, chunksize)
+    
     try:
-        start_time = time.time()
-        print("="*50)
-        print("MEMULAI PEMROSESAN DATA TA")
-        print("="*50)
-        
-        # Create output directory
-        os.makedirs(DEFAULT_OUTPUT_PATH, exist_ok=True)
+        if engine == 'pyarrow':
+            return _read_ta_csv_arrow(file_path, usecols)
+        return pd.read_csv(file_path, dtype=distr_dtypes, **read_kwargs)
+    except (ValueError, TypeError) as e:
+        # Counter berisi nilai non-integer, baca tanpa dtype eksplisit
+        print(f"[WARNING] Kolom distribusi tidak valid di {os.path.basename(file_path)}, "
+              f"dibaca tanpa dtype: {str(e)}")
+        return pd.read_csv(file_path, **read_kwargs)
+
+def _iter_ta_csv_chunks(file_path, distr_dtypes, read_kwargs, chunksize):
+    """
+    Yield typed chunks; on invalid counter values continue without dtype
+    from the first row that has not been yielded yet
+    """
+    rows_done = 0
+    try:
+        for chunk in pd.read_csv(file_path, dtype=distr_dtypes, chunksize=chunksize, **read_kwargs):
+            rows_done += len(chunk)
+            yield chunk
+    except (ValueError, TypeError) as e:
+        print(f"[WARNING] Kolom distribusi tidak valid di {os.path.basename(file_path)}, "
+              f"dibaca tanpa dtype: {str(e)}")
+        for chunk in pd.read_csv(file_path, skiprows=range(1, rows_done + 1),
+                                 chunksize=chunksize, **read_kwargs):
+            yield chunk
+
+def benchmark_csv_read(file_path, repeat=3):
+    """
+    Compare CSV ingestion: default pd.read_csv versus read_ta_csv with the C
+    engine and pyarrow engine (if installed). Returns dict per variant with
+    best time in seconds and DataFrame memory in bytes.
+    """
+    variants = [
+        ('default', lambda: pd.read_csv(file_path)),
+        ('typed_c', lambda: read_ta_csv(file_path, engine='c')),
+    ]
+    if get_csv_engine() == 'pyarrow':
+        variants.append(('typed_pyarrow', lambda: read_ta_csv(file_path, engine='pyarrow')))
+    
+    results = {}
+    for name, reader in variants:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = reader()
+            timings.append(time.perf_counter() - start)
+        results[name] = {
+            'seconds': min(timings),
+            'memory_bytes': int(df.memory_usage(deep=True).sum()),
+            'rows': len(df),
+        }
+        print(f"[INFO] {name}: {min(timings):.3f} detik, "
+              f"{results[name]['memory_bytes'] / 1024 / 1024:.1f} MB")
+    return results
+
+# Perkiraan kebutuhan memori per worker relatif terhadap ukuran file CSV
+WORKER_MEMORY_FACTOR = 4
+MIN_WORKER_MEMORY = 256 * 1024 * 1024
+
+def get_worker_count(csv_files, max_workers=None):
+    """
+    Determine number of worker processes from CPU core count and free memory
+    """
+    try:
+        cpu_count = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+        available_memory = psutil.virtual_memory().available
+        
+        # Worker dibatasi oleh file terbesar agar tidak kehabisan memori
+        largest_file = max(os.path.getsize(f) for f in csv_files)
+        memory_per_worker = max(largest_file * WORKER_MEMORY_FACTOR, MIN_WORKER_MEMORY)
+        memory_workers = max(1, int(available_memory * 0.8 // memory_per_worker))
+        
+        workers = min(cpu_count, memory_workers, len(csv_files))
+        if max_workers:
+            workers = min(workers, max_workers)
+        return max(1, workers)
+    except Exception:
+        return 1
+
+def process_single_file(file_path, chunksize=None, stats=None, cell_cache_path=None, histogram=False):
+    """
+    Read and process one CSV file, return processed DataFrame or None.
+    If a stats dict is given, read/transform wall and CPU time and rows read are added to it.
+    With cell_cache_path, site attributes come from (and are saved to) the cell-dimension cache.
+    With histogram=True the raw histogram columns are kept (see process_ericsson_data).
+    """
+    if stats is None:
+        stats = {}
+    for key in ('read_seconds', 'read_cpu', 'transform_seconds', 'transform_cpu', 'rows_read'):
+        stats.setdefault(key, 0)
+    try:
+        print(f"[INFO] Memproses file: {os.path.basename(file_path)}")
+        cell_cache = get_cell_cache(cell_cache_path) if cell_cache_path else None
+        
+        # Read CSV (per chunk jika chunksize diisi) lalu proses
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        frames = iter(read_ta_csv(file_path, chunksize=chunksize) if chunksize else [read_ta_csv(file_path)])
+        processed_parts = []
+        while True:
+            df = next(frames, None)
+            stats['read_seconds'] += time.perf_counter() - start
+            stats['read_cpu'] += time.thread_time() - cpu_start
+            if df is None:
+                break
+            stats['rows_read'] += len(df)
+            
+            start, cpu_start = time.perf_counter(), time.thread_time()
+            processed_df = process_ericsson_data(df, cell_cache=cell_cache, histogram=histogram)
+            stats['transform_seconds'] += time.perf_counter() - start
+            stats['transform_cpu'] += time.thread_time() - cpu_start
+            if processed_df is not None and not processed_df.empty:
+                processed_parts.append(processed_df)
+            start, cpu_start = time.perf_counter(), time.thread_time()
+        print(f"[INFO] Membaca {stats['rows_read']} baris dari {os.path.basename(file_path)}")
+        if cell_cache is not None:
+            cell_cache.save()
+        
+        if processed_parts:
+            processed_df = concat_processed_frames(processed_parts)
+            print(f"[SUCCESS] Berhasil memproses {len(processed_df)} baris")
+            return processed_df
+        
+        print(f"[WARNING] Tidak ada data yang berhasil diproses dari {os.path.basename(file_path)}")
+        return None
         
-        # Determine if input is file or directory
-        if os.path.isfile(input_path):
-            csv_files = [input_path]
-            print(f"[INFO] Memproses single file: {os.path.basename(input_path)}")
+    except Exception as e:
+        print(f"[ERROR] Error processing {os.path.basename(file_path)}: {str(e)}")
+        return None
+
+def _process_file_with_stats(file_path, chunksize=None, cell_cache_path=None, histogram=False):
+    """Pool worker: process_single_file plus its timing statistics"""
+    stats = {}
+    processed_df = process_single_file(file_path, chunksize=chunksize, stats=stats,
+                                       cell_cache_path=cell_cache_path, histogram=histogram)
+    return processed_df, stats
+
+# Jumlah baris per chunk untuk mode streaming
+DEFAULT_CHUNK_SIZE = 100000
+
+# Manifest file yang sudah diproses (SQLite) untuk pemrosesan incremental
+MANIFEST_FILENAME = "ta_manifest.sqlite"
+
+def get_manifest_path(output_dir=None):
+    """Path of the processed-file manifest, stored in the output folder"""
+    return os.path.join(output_dir or DEFAULT_OUTPUT_PATH, MANIFEST_FILENAME)
+
+def get_upload_target(db_config=None):
+    """Upload target of the manifest entries: host:port/database.table"""
+    db_config = db_config or DB_CONFIG
+    return f"{db_config['host']}:{db_config['port']}/{db_config['database']}.{db_config['table']}"
+
+def _open_manifest(output_dir=None):
+    """Open manifest database, create table if needed"""
+    os.makedirs(output_dir or DEFAULT_OUTPUT_PATH, exist_ok=True)
+    conn = sqlite3.connect(get_manifest_path(output_dir))
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(processed_files)")]
+    if columns and 'target' not in columns:
+        # Manifest lama tanpa target: entri dianggap milik target upload saat ini
+        conn.execute("ALTER TABLE processed_files RENAME TO processed_files_old")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processed_files (
+            path TEXT,
+            target TEXT,
+            size INTEGER,
+            mtime REAL,
+            sha256 TEXT,
+            processed_at TEXT,
+            PRIMARY KEY (path, target)
+        )
+    """)
+    if columns and 'target' not in columns:
+        conn.execute("INSERT INTO processed_files (path, target, size, mtime, sha256, processed_at) "
+                     "SELECT path, ?, size, mtime, sha256, processed_at FROM processed_files_old",
+                     (get_upload_target(),))
+        conn.execute("DROP TABLE processed_files_old")
+        conn.commit()
+    return conn
+
+def compute_file_hash(file_path, block_size=1024 * 1024):
+    """Compute SHA-256 of file content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def filter_new_files(csv_files, force=False, target=None, output_dir=None):
+    """
+    Split CSV files against the manifest entries of an upload target
+    (default: get_upload_target()). Returns (files_to_process, file_info)
+    where file_info maps path -> (size, mtime, sha256) for recording later.
+    Unchanged files (same size and mtime, or same content hash) are skipped.
+    """
+    target = target or get_upload_target()
+    file_info = {}
+    files_to_process = []
+    
+    conn = _open_manifest(output_dir)
+    try:
+        for file_path in csv_files:
+            path = os.path.abspath(file_path)
+            stat = os.stat(path)
+            row = conn.execute(
+                "SELECT size, mtime, sha256 FROM processed_files WHERE path = ? AND target = ?", (path, target)
+            ).fetchone()
+            
+            if not force and row and row[0] == stat.st_size and row[1] == stat.st_mtime:
+                continue
+            
+            # Ukuran/mtime berubah: cek isi file sebelum memproses ulang
+            file_hash = compute_file_hash(path)
+            if not force and row and row[2] == file_hash:
+                conn.execute("UPDATE processed_files SET size = ?, mtime = ? WHERE path = ? AND target = ?",
+                             (stat.st_size, stat.st_mtime, path, target))
+                continue
+            
+            file_info[file_path] = (stat.st_size, stat.st_mtime, file_hash)
+            files_to_process.append(file_path)
+        conn.commit()
+    finally:
+        conn.close()
+    
+    skipped = len(csv_files) - len(files_to_process)
+    if skipped:
+        print(f"[INFO] {skipped} file dilewati (sudah diproses sebelumnya)")
+    return files_to_process, file_info
+
+def record_processed_files(completed_files, file_info, target=None, output_dir=None):
+    """Store files successfully uploaded to target in the manifest"""
+    target = target or get_upload_target()
+    processed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = _open_manifest(output_dir)
+    try:
+        for file_path in completed_files:
+            size, mtime, file_hash = file_info[file_path]
+            conn.execute(
+                "INSERT OR REPLACE INTO processed_files (path, target, size, mtime, sha256, processed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(file_path), target, size, mtime, file_hash, processed_at)
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+def list_manifest(output_dir=None):
+    """Return manifest entries as DataFrame (newest first)"""
+    conn = _open_manifest(output_dir)
+    try:
+        return pd.read_sql_query(
+            "SELECT path, target, size, mtime, sha256, processed_at FROM processed_files "
+            "ORDER BY processed_at DESC, path", conn
+        )
+    finally:
+        conn.close()
+
+# Checkpoint run yang belum selesai, untuk melanjutkan setelah crash/cancel
+CHECKPOINT_DIRNAME = "ta_checkpoint"
+
+def get_checkpoint_dir(output_dir=None):
+    """Folder of run checkpoints, stored in the output folder"""
+    return os.path.join(output_dir or DEFAULT_OUTPUT_PATH, CHECKPOINT_DIRNAME)
+
+class RunCheckpoint:
+    """
+    Checkpoint of one run: processed frames of completed files (pickled, so a
+    resumed run skips reading and transforming them) and committed upload rows
+    per uploaded part. A run is identified by its input files (path, size,
+    mtime) and settings; the same run started again resumes from here.
+    """
+    
+    def __init__(self, csv_files, settings=None, output_dir=None):
+        fingerprint = [(os.path.abspath(f), os.path.getsize(f), os.path.getmtime(f)) for f in sorted(csv_files)]
+        run_key = hashlib.sha256(json.dumps([fingerprint, settings or {}]).encode()).hexdigest()[:16]
+        self.directory = os.path.join(get_checkpoint_dir(output_dir), run_key)
+        self.resumed = os.path.exists(os.path.join(self.directory, 'state.sqlite'))
+        os.makedirs(self.directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.directory, 'state.sqlite'), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS frames (path TEXT, seq INTEGER, file_name TEXT, rows INTEGER,
+                                               PRIMARY KEY (path, seq));
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, frames INTEGER, rows INTEGER);
+            CREATE TABLE IF NOT EXISTS uploads (part_id TEXT PRIMARY KEY, rows INTEGER, committed INTEGER);
+        """)
+        self._conn.commit()
+        self._frame_seq = {}
+    
+    def completed_files(self):
+        """Files whose processed frames are all in the checkpoint"""
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT path FROM files")}
+    
+    def load_frames(self, file_path):
+        """Yield saved processed frames of a completed file, in order"""
+        with self._lock:
+            rows = self._conn.execute("SELECT file_name FROM frames WHERE path = ? ORDER BY seq",
+                                      (os.path.abspath(file_path),)).fetchall()
+        for (file_name,) in rows:
+            yield pd.read_pickle(os.path.join(self.directory, file_name))
+    
+    def save_frame(self, file_path, df):
+        """Store one processed frame of a file (written atomically)"""
+        path = os.path.abspath(file_path)
+        seq = self._frame_seq.get(path, 0)
+        self._frame_seq[path] = seq + 1
+        file_name = f"{hashlib.sha1(path.encode()).hexdigest()[:12]}-{seq}.pkl"
+        tmp_path = os.path.join(self.directory, file_name + ".tmp")
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, file_name))
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO frames (path, seq, file_name, rows) VALUES (?, ?, ?, ?)",
+                               (path, seq, file_name, len(df)))
+            self._conn.commit()
+    
+    def file_completed(self, file_path):
+        """Mark all frames of a file as saved"""
+        path = os.path.abspath(file_path)
+        with self._lock:
+            frames, rows = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM frames WHERE path = ?",
+                                              (path,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO files (path, frames, rows) VALUES (?, ?, ?)",
+                               (path, frames, rows))
+            self._conn.commit()
+    
+    def discard_partial(self, file_path):
+        """Forget frames of a file that was not completed (it is processed again)"""
+        path = os.path.abspath(file_path)
+        self._frame_seq[path] = 0
+        with self._lock:
+            self._conn.execute("DELETE FROM frames WHERE path = ?", (path,))
+            self._conn.commit()
+    
+    @staticmethod
+    def part_id(df, key_hash=None):
+        """Content id of an upload part: row count and hash of its (DateId, Cell) keys"""
+        if key_hash is None:
+            key_hash = pd.util.hash_pandas_object(df[['DateId', 'Cell']], index=False).to_numpy()
+        return f"{len(df)}-{int(key_hash.sum(dtype=np.uint64))}"
+    
+    def uploaded_rows(self, part_id):
+        """Rows of an upload part already committed to the database"""
+        with self._lock:
+            row = self._conn.execute("SELECT committed FROM uploads WHERE part_id = ?", (part_id,)).fetchone()
+        return row[0] if row else 0
+    
+    def add_uploaded(self, part_id, rows, total_rows):
+        """Record committed rows of an upload part (called per batch)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO uploads (part_id, rows, committed) VALUES (?, ?, ?) "
+                "ON CONFLICT(part_id) DO UPDATE SET committed = MIN(rows, committed + excluded.committed)",
+                (part_id, total_rows, rows)
+            )
+            self._conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    def discard(self):
+        """Delete the checkpoint after a successful run"""
+        import shutil
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+# Format output kolumnar yang didukung (membutuhkan pyarrow)
+COLUMNAR_FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+PARTITION_DIRNAME = "ta_partitions"
+# Output kolumnar test mode dipisah dari output produksi
+PARTITION_TEST_DIRNAME = "ta_partitions_test"
+
+def to_typed_frame(df):
+    """
+    Convert processed frame to typed columns for columnar output:
+    DateId as date, '\\N' percentiles as real NaN, integer Sector/TotSample
+    """
+    typed = df.copy()
+    for col in typed.columns:
+        if isinstance(typed[col].dtype, pd.CategoricalDtype):
+            typed[col] = typed[col].astype(str)
+    typed['DateId'] = pd.to_datetime(typed['DateId'])
+    for name, _ in PERCENTILE_LEVELS:
+        # Float32 -> float64 dibulatkan ulang seperti to_plain_frame (tanpa noise float)
+        typed[name] = pd.to_numeric(typed[name], errors='coerce').astype('float64').round(2)
+    typed['Sector'] = pd.to_numeric(typed['Sector'], errors='coerce').astype('int64')
+    typed['TotSample'] = pd.to_numeric(typed['TotSample'], errors='coerce').astype('int64')
+    return typed
+
+class ColumnarSink:
+    """
+    Sink that writes compressed Parquet/Feather files partitioned by DateId
+    (<partition_dir>/DateId=YYYY-MM-DD/part-<run>-<n>.parquet). Files are
+    written under a temporary name and renamed, so readers never see partial files.
+    """
+    name = 'columnar'
+    
+    def __init__(self, partition_dir, file_format='parquet', compression='zstd'):
+        if file_format not in COLUMNAR_FORMATS:
+            raise ValueError(f"Format tidak didukung: {file_format}")
+        self.partition_dir = partition_dir
+        self.file_format = file_format
+        self.compression = compression
+        # PID + uuid: dua run pada detik yang sama tidak menimpa part satu sama lain
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.rows = 0
+        self.part_number = 0
+    
+    def open(self):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Output Parquet/Feather membutuhkan package pyarrow")
+        os.makedirs(self.partition_dir, exist_ok=True)
+        self.rows = 0
+        self.part_number = 0
+    
+    def prepare(self, df):
+        """Frame as written to the files"""
+        return to_typed_frame(df)
+    
+    def write(self, df):
+        typed = self.prepare(df)
+        extension = COLUMNAR_FORMATS[self.file_format]
+        
+        for date_id, day_df in typed.groupby(typed['DateId'].dt.strftime('%Y-%m-%d'), sort=False):
+            day_dir = os.path.join(self.partition_dir, f"DateId={date_id}")
+            os.makedirs(day_dir, exist_ok=True)
+            
+            self.part_number += 1
+            file_name = f"part-{self.run_id}-{self.part_number:05d}{extension}"
+            tmp_path = os.path.join(day_dir, f".{file_name}.tmp")
+            day_df = day_df.reset_index(drop=True)
+            
+            if self.file_format == 'parquet':
+                day_df.to_parquet(tmp_path, index=False, compression=self.compression)
+            else:
+                day_df.to_feather(tmp_path, compression=self.compression)
+            
+            # Rename atomik: file hanya terlihat setelah selesai ditulis
+            os.replace(tmp_path, os.path.join(day_dir, file_name))
+        
+        self.rows += len(df)
+    
+    def close(self):
+        if self.rows:
+            print(f"[SUCCESS] Data {self.file_format} disimpan ke: {self.partition_dir}")
+
+def read_ta_partitions(partition_dir, date_from=None, date_to=None, columns=None, cells=None):
+    """
+    Read partitioned Parquet/Feather output for a DateId range, only the
+    requested columns and optionally only some cells. When a day was
+    processed more than once the latest run wins per (DateId, Cell).
+    """
+    key_cols = ['DateId', 'Cell']
+    read_columns = None if columns is None else list(dict.fromkeys(key_cols + list(columns)))
+    # Tanggal (str, date, datetime, Timestamp) dibandingkan sebagai YYYY-MM-DD
+    date_from = pd.Timestamp(date_from).strftime('%Y-%m-%d') if date_from is not None else None
+    date_to = pd.Timestamp(date_to).strftime('%Y-%m-%d') if date_to is not None else None
+    
+    frames = []
+    for entry in sorted(os.listdir(partition_dir)):
+        if not entry.startswith("DateId="):
+            continue
+        date_id = entry.split("=", 1)[1]
+        if (date_from and date_id < date_from) or (date_to and date_id > date_to):
+            continue
+        
+        day_dir = os.path.join(partition_dir, entry)
+        for file_name in sorted(os.listdir(day_dir)):
+            file_path = os.path.join(day_dir, file_name)
+            if file_name.endswith('.parquet'):
+                filters = [('Cell', 'in', list(cells))] if cells is not None else None
+                df = pd.read_parquet(file_path, columns=read_columns, filters=filters)
+            elif file_name.endswith('.feather'):
+                df = pd.read_feather(file_path, columns=read_columns)
+                if cells is not None:
+                    df = df[df['Cell'].isin(cells)]
+            else:
+                continue
+            frames.append(df)
+    
+    if not frames:
+        return pd.DataFrame(columns=read_columns or [])
+    
+    result = pd.concat(frames, ignore_index=True)
+    result = result.drop_duplicates(subset=key_cols, keep='last').reset_index(drop=True)
+    if columns is not None:
+        result = result[list(columns)]
+    return result
+
+HISTOGRAM_DIRNAME = "ta_histogram"
+HISTOGRAM_TEST_DIRNAME = "ta_histogram_test"
+
+class HistogramSink(ColumnarSink):
+    """
+    Columnar store of the raw daily histogram per cell (DateId, Cell, SiteId,
+    Bin00..Bin34 as uint32), partitioned by DateId like ColumnarSink.
+    Needs frames processed with histogram=True.
+    """
+    name = 'histogram'
+    wants_histogram = True
+    
+    def prepare(self, df):
+        histogram_df = df[['DateId', 'Cell', 'SiteId'] + HISTOGRAM_COLS].copy()
+        for col in ('Cell', 'SiteId'):
+            histogram_df[col] = histogram_df[col].astype(str)
+        histogram_df['DateId'] = pd.to_datetime(histogram_df['DateId'].astype(str))
+        return histogram_df
+    
+    def close(self):
+        if self.rows:
+            print(f"[SUCCESS] Histogram harian disimpan ke: {self.partition_dir}")
+
+def get_histogram_dir(output_dir=None, test_mode=False):
+    """Histogram store in the output folder; test mode runs use their own folder"""
+    return os.path.join(output_dir or DEFAULT_OUTPUT_PATH, HISTOGRAM_TEST_DIRNAME if test_mode else HISTOGRAM_DIRNAME)
+
+def query_histogram_range(date_from, date_to, cells=None, sites=None, group_by='Cell', histogram_dir=None):
+    """
+    Exact TA percentiles over a date window: daily histograms are summed per
+    group_by ('Cell', 'SiteId' or None for one total) and percentiles are
+    computed from the summed counts. cells/sites limit the rows used.
+    Returns DataFrame: group column, Days, Distr50..Distr100, TotSample.
+    """
+    histogram_dir = histogram_dir or get_histogram_dir()
+    columns = ['DateId', 'Cell', 'SiteId'] + HISTOGRAM_COLS
+    df = read_ta_partitions(histogram_dir, date_from=date_from, date_to=date_to,
+                            columns=columns, cells=cells)
+    if sites is not None:
+        df = df[df['SiteId'].isin(list(sites))]
+    
+    if group_by is None:
+        keys = pd.Series(['ALL'] * len(df), index=df.index, name='Group')
+    else:
+        keys = df[group_by]
+    grouped = df[HISTOGRAM_COLS].astype(np.int64).groupby(keys, sort=True)
+    counts = grouped.sum()
+    
+    percentiles = calculate_percentiles_vectorized(counts.to_numpy(dtype=np.int64))
+    result = pd.DataFrame({
+        counts.index.name or 'Group': counts.index.to_numpy(),
+        'Days': df.groupby(keys, sort=True)['DateId'].nunique().to_numpy(),
+    })
+    for name, _ in PERCENTILE_LEVELS:
+        result[name] = percentiles[name]
+    result['TotSample'] = percentiles['TotSample']
+    return result
+
+CUBE_DIRNAME = "ta_cube"
+CUBE_TEST_DIRNAME = "ta_cube_test"
+CUBE_VERSION = 1
+# Kapasitas awal/penambahan: hari per blok dan cell per blok (file memmap dibuat sparse)
+CUBE_DAYS_BLOCK = 366
+CUBE_CELLS_BLOCK = 1024
+# Jumlah cell per langkah saat menyalin cube ke kapasitas baru
+CUBE_COPY_CELLS = 4096
+
+def get_cube_dir(output_dir=None, test_mode=False):
+    """Cube folder in the output folder; test mode runs use their own folder"""
+    return os.path.join(output_dir or DEFAULT_OUTPUT_PATH, CUBE_TEST_DIRNAME if test_mode else CUBE_DIRNAME)
+
+class HistogramCube:
+    """
+    On-disk cells x days x 35 histogram cube backed by numpy.memmap
+    (counts.dat uint32, present.dat bool). cube.json holds the cell-name ->
+    row index (with SiteId per cell) and the first date (column 0); the
+    column of a date is its day offset from it. Appending a day writes only
+    its cells' rows; capacity grows by blocks, rarely needing a full copy.
+    A grow writes a new generation of array files (counts.N.dat) and
+    switches cube.json to it, so the index always matches its arrays.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "cube.json")
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if meta.get('version') != CUBE_VERSION or meta.get('bins') != len(HISTOGRAM_COLS):
+                raise ValueError(f"Versi cube tidak cocok: {self.meta_path}")
+            self.cells = meta['cells']
+            self.sites = meta['sites']
+            self.start_date = np.datetime64(meta['start_date'], 'D') if meta['start_date'] else None
+            self.days = meta['days']
+            self.cell_capacity = meta['cell_capacity']
+            self.day_capacity = meta['day_capacity']
+            self.generation = meta.get('generation', 0)
+        else:
+            self.cells, self.sites = [], []
+            self.start_date = None
+            self.days = 0
+            self.cell_capacity, self.day_capacity = CUBE_CELLS_BLOCK, CUBE_DAYS_BLOCK
+            self.generation = 0
+        self.cell_index = {cell: row for row, cell in enumerate(self.cells)}
+        self._remove_stale_arrays()
+        self.counts, self.present = self._open_arrays(self.cell_capacity, self.day_capacity,
+                                                      create=not os.path.exists(self.meta_path))
+    
+    def _array_paths(self, generation=None):
+        generation = self.generation if generation is None else generation
+        suffix = f".{generation}" if generation else ''
+        return (os.path.join(self.directory, f"counts{suffix}.dat"),
+                os.path.join(self.directory, f"present{suffix}.dat"))
+    
+    def _remove_stale_arrays(self):
+        """Delete array files not referenced by cube.json (left by an interrupted grow)"""
+        current = {os.path.basename(path) for path in self._array_paths()}
+        for name in os.listdir(self.directory):
+            if re.fullmatch(r'(counts|present)(\.\d+)?\.dat(\.tmp)?', name) and name not in current:
+                os.remove(os.path.join(self.directory, name))
+    
+    def _open_arrays(self, cell_capacity, day_capacity, generation=None, create=False):
+        counts_path, present_path = self._array_paths(generation)
+        mode = 'w+' if create else 'r+'
+        counts = np.memmap(counts_path, dtype=np.uint32, mode=mode,
+                           shape=(cell_capacity, day_capacity, len(HISTOGRAM_COLS)))
+        present = np.memmap(present_path, dtype=np.bool_, mode=mode, shape=(cell_capacity, day_capacity))
+        return counts, present
+    
+    def _grow(self, cell_capacity, day_capacity, day_offset=0):
+        """
+        Copy the cube into larger arrays of the next generation (day_offset
+        shifts existing columns right), switch cube.json to them, then
+        delete the old generation
+        """
+        print(f"[INFO] Memperbesar cube histogram: {cell_capacity} cell x {day_capacity} hari")
+        generation = self.generation + 1
+        counts, present = self._open_arrays(cell_capacity, day_capacity, generation=generation, create=True)
+        for start in range(0, len(self.cells), CUBE_COPY_CELLS):
+            rows = slice(start, min(start + CUBE_COPY_CELLS, len(self.cells)))
+            counts[rows, day_offset:day_offset + self.days] = self.counts[rows, :self.days]
+            present[rows, day_offset:day_offset + self.days] = self.present[rows, :self.days]
+        counts.flush()
+        present.flush()
+        del counts, present, self.counts, self.present
+        
+        # Index baru ditulis sebelum file lama dihapus: crash di sini tetap konsisten
+        old_paths = self._array_paths()
+        self.generation = generation
+        self.cell_capacity, self.day_capacity = cell_capacity, day_capacity
+        if self.start_date is not None:
+            self.start_date -= np.timedelta64(day_offset, 'D')
+            self.days += day_offset
+        self._write_meta()
+        for path in old_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # dibersihkan saat cube dibuka berikutnya
+        self.counts, self.present = self._open_arrays(cell_capacity, day_capacity)
+    
+    def _ensure_capacity(self, cell_count, first_date, last_date):
+        day_offset = 0
+        start_date = self.start_date if self.start_date is not None else first_date
+        if first_date < start_date:
+            day_offset = int((start_date - first_date).astype(int))
+            start_date = first_date
+        days = max(self.days + day_offset, int((last_date - start_date).astype(int)) + 1)
+        
+        cell_capacity, day_capacity = self.cell_capacity, self.day_capacity
+        while cell_capacity < cell_count:
+            cell_capacity += max(CUBE_CELLS_BLOCK, cell_capacity // 2)
+        while day_capacity < days:
+            day_capacity += CUBE_DAYS_BLOCK
+        if day_offset or (cell_capacity, day_capacity) != (self.cell_capacity, self.day_capacity):
+            self._grow(cell_capacity, day_capacity, day_offset)
+        self.start_date, self.days = start_date, days
+    
+    def append(self, df):
+        """
+        Write histograms of a processed frame (histogram=True) into the cube.
+        A cell-day already in the cube is overwritten (last write wins).
+        """
+        if df is None or df.empty:
+            return 0
+        dates = pd.to_datetime(df['DateId'].astype(str)).to_numpy().astype('datetime64[D]')
+        cells = df['Cell'].astype(str).to_numpy()
+        sites = df['SiteId'].astype(str).to_numpy()
+        
+        new_cells = {}
+        for cell, site in zip(cells, sites):
+            if cell not in self.cell_index and cell not in new_cells:
+                new_cells[cell] = site
+        self._ensure_capacity(len(self.cells) + len(new_cells), dates.min(), dates.max())
+        for cell, site in new_cells.items():
+            row = len(self.cells)
+            # Baris bisa berisi sisa run yang crash sebelum flush (tidak tercatat di cube.json);
+            # hanya ditulis jika tidak kosong agar file sparse tetap sparse
+            if self.present[row].any() or self.counts[row].any():
+                self.counts[row] = 0
+                self.present[row] = False
+            self.cell_index[cell] = row
+            self.cells.append(cell)
+            self.sites.append(site)
+        
+        rows = np.fromiter((self.cell_index[cell] for cell in cells), dtype=np.int64, count=len(cells))
+        columns = (dates - self.start_date).astype(np.int64)
+        self.counts[rows, columns] = df[HISTOGRAM_COLS].to_numpy(dtype=np.uint32)
+        self.present[rows, columns] = True
+        return len(df)
+    
+    def flush(self):
+        """Flush arrays to disk, then write the index atomically"""
+        self.counts.flush()
+        self.present.flush()
+        self._write_meta()
+    
+    def _write_meta(self):
+        meta = {
+            'version': CUBE_VERSION,
+            'bins': len(HISTOGRAM_COLS),
+            'start_date': str(self.start_date) if self.start_date is not None else None,
+            'days': self.days,
+            'cell_capacity': self.cell_capacity,
+            'day_capacity': self.day_capacity,
+            'generation': self.generation,
+            'cells': self.cells,
+            'sites': self.sites,
+        }
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+    
+    def dates(self):
+        """Dates of the cube columns in use"""
+        if self.start_date is None:
+            return np.array([], dtype='datetime64[D]')
+        return self.start_date + np.arange(self.days)
+    
+    def date_slice(self, date_from=None, date_to=None):
+        """Column slice for an inclusive date range (clipped to the cube)"""
+        if self.start_date is None:
+            return slice(0, 0)
+        start = 0 if date_from is None else int((np.datetime64(str(date_from), 'D') - self.start_date).astype(int))
+        stop = self.days if date_to is None else int((np.datetime64(str(date_to), 'D') - self.start_date).astype(int)) + 1
+        return slice(min(max(start, 0), self.days), min(max(stop, 0), self.days))
+    
+    def cell_rows(self, cells=None, sites=None):
+        """Row indexes of the given cells and/or sites (all cells if both None)"""
+        rows = np.arange(len(self.cells))
+        if cells is not None:
+            rows = np.array([self.cell_index[cell] for cell in cells if cell in self.cell_index], dtype=np.int64)
+        if sites is not None:
+            site_set = set(sites)
+            rows = rows[np.fromiter((self.sites[row] in site_set for row in rows), dtype=bool, count=len(rows))]
+        return rows
+    
+    def window(self, date_from=None, date_to=None):
+        """Zero-copy view (cells x days x 35) of all cells over a date range"""
+        return self.counts[:len(self.cells), self.date_slice(date_from, date_to)]
+    
+    def query(self, date_from=None, date_to=None, cells=None, sites=None, group_by='Cell'):
+        """
+        Exact percentiles over a date window from the summed histograms,
+        per 'Cell', per 'SiteId' or one total (group_by=None).
+        Returns the same columns as query_histogram_range.
+        """
+        days = self.date_slice(date_from, date_to)
+        if cells is None and sites is None:
+            # Semua cell: reduksi langsung pada view memmap tanpa fancy indexing
+            rows = np.arange(len(self.cells))
+            counts = self.window(date_from, date_to)
+            present = self.present[:len(self.cells), days]
+        else:
+            rows = self.cell_rows(cells, sites)
+            counts = self.counts[rows, days]
+            present = self.present[rows, days]
+        sums = counts.sum(axis=1, dtype=np.int64)
+        
+        if group_by == 'Cell':
+            keys = np.array(self.cells, dtype=object)[rows]
+        elif group_by == 'SiteId':
+            keys = np.array(self.sites, dtype=object)[rows]
+        elif group_by is None:
+            keys = np.full(len(rows), 'ALL', dtype=object)
+        else:
+            raise ValueError(f"group_by tidak didukung: {group_by}")
+        
+        groups, codes = np.unique(keys, return_inverse=True)
+        grouped = np.zeros((len(groups), len(HISTOGRAM_COLS)), dtype=np.int64)
+        np.add.at(grouped, codes, sums)
+        # Days: jumlah hari yang punya data (untuk grup: di salah satu cell-nya)
+        grouped_present = np.zeros((len(groups), present.shape[1]), dtype=bool)
+        np.logical_or.at(grouped_present, codes, present)
+        
+        percentiles = calculate_percentiles_vectorized(grouped)
+        result = pd.DataFrame({group_by or 'Group': groups, 'Days': grouped_present.sum(axis=1)})
+        for name, _ in PERCENTILE_LEVELS:
+            result[name] = percentiles[name]
+        result['TotSample'] = percentiles['TotSample']
+        return result
+
+class CubeSink:
+    """Sink that appends daily histograms to a HistogramCube (needs histogram=True frames)"""
+    name = 'cube'
+    wants_histogram = True
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self.cube = None
+        self.rows = 0
+    
+    def open(self):
+        self.cube = HistogramCube(self.directory)
+        self.rows = 0
+    
+    def write(self, df):
+        self.rows += self.cube.append(df)
+    
+    def close(self):
+        self.cube.flush()
+        if self.rows:
+            print(f"[SUCCESS] Cube histogram diperbarui: {self.directory} "
+                  f"({len(self.cube.cells)} cell x {self.cube.days} hari)")
+
+def discover_csv_files(input_path):
+    """
+    Discovery stage: return list of CSV files from a file or folder path
+    """
+    if os.path.isfile(input_path):
+        print(f"[INFO] Memproses single file: {os.path.basename(input_path)}")
+        return [input_path]
+    
+    csv_files = [os.path.join(input_path, f) for f in os.listdir(input_path) 
+                if f.lower().endswith('.csv')]
+    print(f"[INFO] Memproses {len(csv_files)} file CSV dari folder")
+    return csv_files
+
+class CsvSink:
+    """
+    Sink that appends processed frames to one CSV file
+    """
+    name = 'csv'
+    
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.rows = 0
+    
+    def open(self):
+        self.rows = 0
+    
+    def write(self, df):
+        # Persentil ditulis dari float64 (format Float32 lebih lambat di to_csv)
+        df = df.assign(**{name: df[name].astype('float64').round(2)
+                          for name, _ in PERCENTILE_LEVELS if name in df.columns})
+        # Header hanya ditulis pada frame pertama; NA ditulis sebagai \N
+        df.to_csv(self.output_file, mode='a' if self.rows else 'w', header=not self.rows, index=False,
+                  na_rep='\\N')
+        self.rows += len(df)
+    
+    def close(self):
+        if self.rows:
+            print(f"[SUCCESS] Data disimpan ke: {self.output_file}")
+
+# Jumlah thread writer database dan frame yang boleh antre per writer
+DEFAULT_DB_WRITERS = 2
+DB_WRITER_QUEUE_SIZE = 2
+DB_WRITER_RETRIES = 3
+
+class DatabaseSink:
+    """
+    Sink that upserts processed frames into tainit_cell_day on background
+    writer threads, so uploads run while later files are still being parsed.
+    Rows are routed to writers by hash of (DateId, Cell), so updates of the
+    same key always go through the same writer in order. Each writer queue is
+    bounded, which keeps memory flat when the database is the slower side.
+    With a RunCheckpoint, committed rows are recorded per batch and a resumed
+    run continues each part after its last committed batch. Parts left
+    unfinished by a cancel are counted and close() marks the sink cancelled.
+    """
+    name = 'database'
+    
+    def __init__(self, engine, delta=False, batch_size=DEFAULT_UPLOAD_BATCH_SIZE, writers=DEFAULT_DB_WRITERS,
+                 progress=None, checkpoint=None, cancel_event=None):
+        self.engine = engine
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.cancel_event = cancel_event
+        self.delta = delta
+        self.batch_size = batch_size
+        self.writers = max(1, writers)
+        self.rows = 0
+        self.unfinished = 0
+        self.cancelled = False
+        self.busy_seconds = 0.0
+        self.busy_cpu_seconds = 0.0
+        self._queues = []
+        self._threads = []
+        self._errors = []
+        self._lock = threading.Lock()
+    
+    def open(self):
+        self.rows = 0
+        self.unfinished = 0
+        self.cancelled = False
+        self.busy_seconds = 0.0
+        self.busy_cpu_seconds = 0.0
+        self._errors = []
+        self._queues = [queue.Queue(maxsize=DB_WRITER_QUEUE_SIZE) for _ in range(self.writers)]
+        self._threads = [threading.Thread(target=self._writer, args=(q,), daemon=True) for q in self._queues]
+        for thread in self._threads:
+            thread.start()
+    
+    def is_cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+    
+    def _writer(self, frames):
+        """Writer thread: upload frames from its queue until the end marker"""
+        while True:
+            item = frames.get()
+            if item is _END_OF_STREAM:
+                return
+            if self._errors or self.is_cancelled():
+                # Upload lain sudah gagal atau dibatalkan, sisa antrian dibuang (belum di-upload)
+                with self._lock:
+                    self.unfinished += 1
+                continue
+            
+            df, part_id = item
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            
+            # Lanjutkan dari batch terakhir yang sudah di-commit (checkpoint)
+            done = self.checkpoint.uploaded_rows(part_id) if self.checkpoint is not None else 0
+            if done and self.progress is not None:
+                self.progress.add(rows_uploaded=min(done, len(df)))
+            if done >= len(df):
+                with self._lock:
+                    self.rows += len(df)
+                continue
+            if self.delta:
+                # Delta dihitung ulang terhadap isi database, baris yang sudah masuk tidak dikirim lagi
+                done = 0
+            
+            # Upsert idempoten, aman diulang (mis. deadlock antar writer)
+            success = False
+            for _ in range(DB_WRITER_RETRIES):
+                if self.is_cancelled():
+                    break
+                credited = []
+                if upload_to_database(df.iloc[done:], self.engine, batch_size=self.batch_size, delta=self.delta,
+                                      on_batch=functools.partial(self._batch_uploaded, credited, part_id, len(df)),
+                                      cancel_event=self.cancel_event):
+                    success = True
+                    break
+                if self.delta:
+                    # Baris delta dihitung ulang pada percobaan berikutnya
+                    self._batch_uploaded(credited, None, len(df), -sum(credited))
+                else:
+                    # Batch yang sudah di-commit tidak dikirim ulang
+                    done += sum(credited)
+            
+            if success and self.checkpoint is not None and self.delta:
+                self.checkpoint.add_uploaded(part_id, len(df), len(df))
+            
+            with self._lock:
+                self.busy_seconds += time.perf_counter() - start
+                self.busy_cpu_seconds += time.thread_time() - cpu_start
+                if success:
+                    self.rows += len(df)
+                else:
+                    self.unfinished += 1
+                    if not self.is_cancelled():
+                        self._errors.append(f"Upload database gagal ({len(df)} baris)")
+    
+    def _batch_uploaded(self, credited, part_id, part_rows, rows):
+        credited.append(rows)
+        if self.progress is not None:
+            self.progress.add(rows_uploaded=rows)
+        if self.checkpoint is not None and part_id is not None and not self.delta:
+            self.checkpoint.add_uploaded(part_id, rows, part_rows)
+    
+    def write(self, df):
+        if self._errors:
+            raise RuntimeError(self._errors[0])
+        
+        # Bagi baris ke writer berdasarkan hash key (DateId, Cell)
+        key_hash = pd.util.hash_pandas_object(df[['DateId', 'Cell']], index=False).to_numpy()
+        if self.writers == 1:
+            self._queues[0].put((df, RunCheckpoint.part_id(df, key_hash)))
+            return
+        
+        writer_ids = key_hash % self.writers
+        for writer_id, frames in enumerate(self._queues):
+            mask = writer_ids == writer_id
+            part = df[mask]
+            if not part.empty:
+                frames.put((part, RunCheckpoint.part_id(part, key_hash[mask])))
+    
+    def close(self):
+        # Tunggu semua upload yang masih antre selesai
+        for frames in self._queues:
+            frames.put(_END_OF_STREAM)
+        for thread in self._threads:
+            thread.join()
+        
+        if self._errors:
+            raise RuntimeError(self._errors[0])
+        if self.unfinished:
+            self.cancelled = True
+            print(f"[WARNING] Upload dibatalkan: {self.unfinished} bagian data belum di-upload")
+        elif self.rows:
+            print(f"[SUCCESS] Upload database berhasil: {self.rows} baris")
+
+class NullSink:
+    """
+    Sink that discards processed frames (for benchmarking)
+    """
+    name = 'null'
+    
+    def __init__(self):
+        self.rows = 0
+    
+    def open(self):
+        self.rows = 0
+    
+    def write(self, df):
+        self.rows += len(df)
+    
+    def close(self):
+        pass
+
+# Penanda akhir file / akhir stream pada antrian reader
+_END_OF_FILE = object()
+_END_OF_STREAM = object()
+# Penanda file selesai tanpa data (error baca atau tidak ada baris valid)
+_FILE_FAILED = object()
+
+class _ReaderError:
+    """Exception of the prefetch reader thread, re-raised in the consumer"""
+    
+    def __init__(self, error):
+        self.error = error
+
+# Jumlah frame yang dibaca lebih dulu oleh thread reader
+DEFAULT_PREFETCH = 2
+
+# Frame besar ditransformasi per irisan agar pembatalan bisa dicek di tengah transform
+TRANSFORM_SLICE_ROWS = 250000
+
+class ResourceMonitor:
+    """
+    Sample RSS of this process and its children (pool workers) on a
+    background thread to find peak memory; also measures total CPU time
+    """
+    
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_rss = 0
+        self.cpu_seconds = 0.0
+        self._process = psutil.Process()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._cpu_start = 0.0
+    
+    def _cpu_total(self):
+        times = self._process.cpu_times()
+        return times.user + times.system + getattr(times, 'children_user', 0) + getattr(times, 'children_system', 0)
+    
+    def sample(self):
+        try:
+            rss = self._process.memory_info().rss
+            for child in self._process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak_rss = max(self.peak_rss, rss)
+        except psutil.Error:
+            pass
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+    
+    def start(self):
+        self._cpu_start = self._cpu_total()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        self.cpu_seconds = self._cpu_total() - self._cpu_start
+
+# Interval minimum antar event progress (detik)
+PROGRESS_INTERVAL = 0.5
+
+def estimate_row_bytes(file_path, sample_bytes=1024 * 1024):
+    """Average bytes per data row, estimated from the start of a CSV file"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    lines = sample.count(b'\n')
+    if lines <= 1:
+        return max(len(sample), 1)
+    # Baris pertama adalah header
+    header_end = sample.index(b'\n') + 1
+    return max((sample.rfind(b'\n') + 1 - header_end) / (lines - 1), 1)
+
+class ProgressTracker:
+    """
+    Run progress in bytes read, files completed, rows transformed and rows
+    uploaded, with throughput and ETA. Counters are updated from any thread;
+    callback(snapshot) is called at most every `interval` seconds (and on
+    finish). Chunks of a file are counted as estimated bytes until the file is done.
+    """
+    
+    def __init__(self, csv_files, callback=None, upload=False, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.upload = upload
+        self.interval = interval
+        self.files_total = len(csv_files)
+        self.file_bytes = {file_path: os.path.getsize(file_path) for file_path in csv_files}
+        self.bytes_total = sum(self.file_bytes.values())
+        self.files_completed = 0
+        self.bytes_read = 0
+        self.rows_transformed = 0
+        self.rows_uploaded = 0
+        self.finished = False
+        self._file_bytes_read = {}
+        self._row_bytes = {}
+        self._start = time.perf_counter()
+        self._last_emit = 0.0
+        self._lock = threading.Lock()
+    
+    def add(self, **increments):
+        """Add to counters (rows_transformed, rows_uploaded)"""
+        with self._lock:
+            for key, value in increments.items():
+                setattr(self, key, getattr(self, key) + value)
+        self.emit()
+    
+    def chunk_read(self, file_path, rows):
+        """Count an estimated number of bytes for rows read from a file"""
+        with self._lock:
+            if file_path not in self._row_bytes:
+                self._row_bytes[file_path] = estimate_row_bytes(file_path)
+            done = self._file_bytes_read.get(file_path, 0)
+            added = int(min(rows * self._row_bytes[file_path], self.file_bytes.get(file_path, 0) - done))
+            self._file_bytes_read[file_path] = done + added
+            self.bytes_read += added
+        self.emit()
+    
+    def file_done(self, file_path):
+        """Mark a file as completely read and transformed"""
+        with self._lock:
+            size = self.file_bytes.get(file_path, 0)
+            self.bytes_read += size - self._file_bytes_read.get(file_path, 0)
+            self._file_bytes_read[file_path] = size
+            self.files_completed += 1
+        self.emit()
+    
+    def finish(self):
+        self.finished = True
+        self.emit(force=True)
+    
+    def snapshot(self):
+        """Current progress as dict (fraction 0..1, ETA in seconds or None)"""
+        with self._lock:
+            elapsed = time.perf_counter() - self._start
+            read_fraction = self.bytes_read / self.bytes_total if self.bytes_total else 1.0
+            fraction = read_fraction
+            if self.upload and self.rows_transformed:
+                # Perkiraan total baris dari proporsi byte yang sudah dibaca
+                expected_rows = self.rows_transformed / max(read_fraction, 1e-9)
+                fraction = min(read_fraction, self.rows_uploaded / expected_rows)
+            if self.finished:
+                fraction = 1.0
+            eta = elapsed * (1 - fraction) / fraction if 0 < fraction < 1 else (0.0 if fraction >= 1 else None)
+            return {
+                'files_total': self.files_total,
+                'files_completed': self.files_completed,
+                'bytes_total': self.bytes_total,
+                'bytes_read': self.bytes_read,
+                'rows_transformed': self.rows_transformed,
+                'rows_uploaded': self.rows_uploaded,
+                'fraction': min(max(fraction, 0.0), 1.0),
+                'elapsed_seconds': elapsed,
+                'eta_seconds': eta,
+                'bytes_per_sec': self.bytes_read / elapsed if elapsed > 0 else 0.0,
+                'rows_per_sec': self.rows_transformed / elapsed if elapsed > 0 else 0.0,
+                'upload_rows_per_sec': self.rows_uploaded / elapsed if elapsed > 0 else 0.0,
+                'finished': self.finished,
+            }
+    
+    def emit(self, force=False):
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_emit < self.interval:
+                return
+            self._last_emit = now
+        try:
+            self.callback(self.snapshot())
+        except Exception as e:
+            print(f"[WARNING] Error pada progress callback: {str(e)}")
+
+def format_progress(snapshot):
+    """One-line progress text: files, percentage, throughput and ETA"""
+    text = (f"{snapshot['files_completed']}/{snapshot['files_total']} file, "
+            f"{snapshot['fraction'] * 100:.0f}% - "
+            f"{snapshot['bytes_per_sec'] / 1024 / 1024:.1f} MB/s, "
+            f"{snapshot['rows_per_sec']:.0f} baris/detik")
+    if snapshot['rows_uploaded']:
+        text += f", upload {snapshot['upload_rows_per_sec']:.0f} baris/detik"
+    if snapshot['eta_seconds'] is not None and not snapshot['finished']:
+        text += f", sisa {format_duration(snapshot['eta_seconds'])}"
+    return text
+
+class TAPipeline:
+    """
+    Staged TA processing pipeline: discovery -> reader -> transformer -> sinks.
+    In sequential mode the reader runs on a background thread and keeps up to
+    `prefetch` frames ready while the current frame is transformed and written.
+    With more than one worker, files are read and transformed in a process pool
+    while the main process is still writing earlier files to the sinks.
+    Wall time per stage is collected in stage_timings (seconds), CPU time in
+    stage_cpu, rows in stage_rows and per-file statistics in file_stats.
+    With cell_cache_path, site attributes come from the cell-dimension cache.
+    Progress is reported to an optional ProgressTracker. With a RunCheckpoint,
+    processed frames of completed files are saved, and files completed by an
+    earlier (failed or cancelled) run are replayed from it instead of re-read.
+    With histogram=True frames carry the raw histogram columns; only sinks
+    with wants_histogram get them.
+    """
+    
+    def __init__(self, sinks, workers=None, chunksize=None, cancel_event=None, prefetch=DEFAULT_PREFETCH,
+                 cell_cache_path=None, progress=None, checkpoint=None, histogram=False):
+        self.sinks = sinks
+        self.workers = workers
+        self.chunksize = chunksize
+        self.cancel_event = cancel_event
+        self.prefetch = prefetch
+        self.cell_cache_path = cell_cache_path
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.histogram = histogram
+        self.completed_files = []
+        self.total_rows = 0
+        self.cancelled = False
+        self.stage_timings = {}
+        self.stage_cpu = {}
+        self.stage_rows = {}
+        self.file_stats = {}
+        self._timing_lock = threading.Lock()
+    
+    def discover(self, input_path):
+        """Discovery stage"""
+        return discover_csv_files(input_path)
+    
+    def read(self, file_path):
+        """Reader stage: yield raw frames of one file (one frame per chunk)"""
+        if self.chunksize:
+            yield from read_ta_csv(file_path, chunksize=self.chunksize)
         else:
-            csv_files = [os.path.join(input_path, f) for f in os.listdir(input_path) 
-                        if f.lower().endswith('.csv')]
-            print(f"[INFO] Memproses {len(csv_files)} file CSV dari folder")
+            yield read_ta_csv(file_path)
+    
+    def transform(self, df):
+        """
+        Transformer stage. Large frames are transformed in slices of
+        TRANSFORM_SLICE_ROWS so cancel_event is checked during the transform.
+        """
+        cell_cache = get_cell_cache(self.cell_cache_path) if self.cell_cache_path else None
+        if len(df) <= TRANSFORM_SLICE_ROWS:
+            return process_ericsson_data(df, cell_cache=cell_cache, histogram=self.histogram)
+        
+        parts = []
+        for start in range(0, len(df), TRANSFORM_SLICE_ROWS):
+            if self.is_cancelled():
+                return None
+            part = process_ericsson_data(df.iloc[start:start + TRANSFORM_SLICE_ROWS], cell_cache=cell_cache,
+                                         histogram=self.histogram)
+            if part is not None and not part.empty:
+                parts.append(part)
+        return concat_processed_frames(parts) if parts else None
+    
+    def is_cancelled(self):
+        if self.cancel_event and self.cancel_event.is_set():
+            self.cancelled = True
+        return self.cancelled
+    
+    def add_timing(self, stage, seconds, cpu_seconds=None, rows=None):
+        """Accumulate wall time, CPU time and rows of a stage (thread-safe)"""
+        with self._timing_lock:
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0.0) + seconds
+            if cpu_seconds is not None:
+                self.stage_cpu[stage] = self.stage_cpu.get(stage, 0.0) + cpu_seconds
+            if rows is not None:
+                self.stage_rows[stage] = self.stage_rows.get(stage, 0) + rows
+    
+    def update_file_stats(self, file_path, **increments):
+        """Accumulate per-file statistics (thread-safe)"""
+        with self._timing_lock:
+            stats = self.file_stats.get(file_path)
+            if stats is None:
+                stats = {
+                    'file': os.path.basename(file_path),
+                    'bytes': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+                    'rows_read': 0,
+                    'rows_processed': 0,
+                    'read_seconds': 0.0,
+                    'transform_seconds': 0.0,
+                    'completed': False,
+                }
+                self.file_stats[file_path] = stats
+            for key, value in increments.items():
+                if isinstance(value, bool):
+                    stats[key] = value
+                else:
+                    stats[key] += value
+    
+    def _iter_frames(self, csv_files):
+        """
+        Reader stage over all files. Yields (file_path, frame),
+        (file_path, exception) on read error and (file_path, _END_OF_FILE).
+        """
+        for file_path in csv_files:
+            try:
+                frames = self.read(file_path)
+                while True:
+                    start = time.perf_counter()
+                    cpu_start = time.thread_time()
+                    df = next(frames, None)
+                    seconds = time.perf_counter() - start
+                    rows = 0 if df is None else len(df)
+                    self.add_timing('read', seconds, time.thread_time() - cpu_start, rows)
+                    self.update_file_stats(file_path, read_seconds=seconds, rows_read=rows)
+                    if df is None:
+                        break
+                    if self.progress is not None:
+                        self.progress.chunk_read(file_path, rows)
+                    yield file_path, df
+            except Exception as e:
+                yield file_path, e
+                continue
+            yield file_path, _END_OF_FILE
+    
+    def _prefetch(self, items):
+        """
+        Run an iterator on a background thread, keeping at most
+        self.prefetch items ready in a bounded queue. An exception of the
+        iterator is re-raised here; cancel_event is checked while waiting.
+        """
+        buffer = queue.Queue(maxsize=self.prefetch)
+        stop_event = threading.Event()
         
-        if not csv_files:
-            print("[ERROR] Tidak ada file CSV ditemukan")
+        def put(item):
+            while not stop_event.is_set():
+                try:
+                    buffer.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
             return False
         
-        # Database connection
-        engine = None
-        if upload_to_db:
-            engine = create_db_connection()
-            if engine is None:
-                print("[ERROR] Gagal koneksi database, proses dibatalkan")
-                return False
+        def reader():
+            try:
+                for item in items:
+                    if not put(item):
+                        return
+            except Exception as e:
+                put(_ReaderError(e))
+            finally:
+                put(_END_OF_STREAM)
         
-        all_processed_data = []
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        try:
+            while True:
+                # Waktu menunggu reader: besar berarti I/O adalah bottleneck
+                start = time.perf_counter()
+                while True:
+                    if self.is_cancelled():
+                        return
+                    try:
+                        item = buffer.get(timeout=0.5)
+                        break
+                    except queue.Empty:
+                        continue
+                self.add_timing('read_wait', time.perf_counter() - start)
+                if item is _END_OF_STREAM:
+                    return
+                if isinstance(item, _ReaderError):
+                    raise item.error
+                yield item
+        finally:
+            stop_event.set()
+    
+    def _iter_sequential(self, csv_files):
+        """
+        Read and transform files one by one. Yields (file_path, processed_df)
+        per chunk, (file_path, None) when a file is completed and
+        (file_path, _FILE_FAILED) when it ended without processed rows.
+        """
+        frames = self._iter_frames(csv_files)
+        if self.prefetch:
+            frames = self._prefetch(frames)
         
-        # Process each file
-        for file_path in csv_files:
-            try:
-                if cancel_event and cancel_event.is_set():
-                    print("[INFO] Proses dibatalkan oleh user")
-                    return False
+        current_file = None
+        file_rows = 0
+        try:
+            for file_path, item in frames:
+                if self.is_cancelled():
+                    return
                 
-                print(f"[INFO] Memproses file: {os.path.basename(file_path)}")
+                if file_path != current_file:
+                    print(f"[INFO] Memproses file: {os.path.basename(file_path)}")
+                    current_file = file_path
+                    file_rows = 0
                 
-                # Read CSV
-                df = pd.read_csv(file_path)
-                print(f"[INFO] Membaca {len(df)} baris dari {os.path.basename(file_path)}")
+                if isinstance(item, Exception):
+                    print(f"[ERROR] Error processing {os.path.basename(file_path)}: {str(item)}")
+                    yield file_path, _FILE_FAILED
+                    continue
                 
-                # Process data
-                processed_df = process_ericsson_data(df)
-                if processed_df is not None and not processed_df.empty:
-                    all_processed_data.append(processed_df)
-                    print(f"[SUCCESS] Berhasil memproses {len(processed_df)} baris")
-                else:
-                    print(f"[WARNING] Tidak ada data yang berhasil diproses dari {os.path.basename(file_path)}")
+                if item is _END_OF_FILE:
+                    if file_rows:
+                        print(f"[SUCCESS] Berhasil memproses {file_rows} baris dari {os.path.basename(file_path)}")
+                        yield file_path, None
+                    else:
+                        print(f"[WARNING] Tidak ada data yang berhasil diproses dari {os.path.basename(file_path)}")
+                        yield file_path, _FILE_FAILED
+                    continue
                 
-            except Exception as e:
-                print(f"[ERROR] Error processing {os.path.basename(file_path)}: {str(e)}")
-                continue
-        
-        if not all_processed_data:
-            print("[ERROR] Tidak ada data yang berhasil diproses dari semua file")
-            return False
+                start = time.perf_counter()
+                cpu_start = time.thread_time()
+                processed_df = self.transform(item)
+                seconds = time.perf_counter() - start
+                self.add_timing('transform', seconds, time.thread_time() - cpu_start, len(item))
+                self.update_file_stats(file_path, transform_seconds=seconds)
+                if self.is_cancelled():
+                    return
+                if processed_df is None or processed_df.empty:
+                    continue
+                
+                self.update_file_stats(file_path, rows_processed=len(processed_df))
+                if self.progress is not None:
+                    self.progress.add(rows_transformed=len(processed_df))
+                file_rows += len(processed_df)
+                yield file_path, processed_df
+        finally:
+            frames.close()
+    
+    def _iter_pool(self, csv_files, workers):
+        """
+        Read and transform files in a process pool, results in file order.
+        Yields the same items as _iter_sequential.
+        """
+        print(f"[INFO] Memproses {len(csv_files)} file dengan {workers} worker")
         
-        # Combine all data
-        final_df = pd.concat(all_processed_data, ignore_index=True)
-        print(f"[INFO] Total data yang diproses: {len(final_df)} baris")
+        pool = mp.Pool(processes=workers)
+        try:
+            worker = functools.partial(_process_file_with_stats, chunksize=self.chunksize,
+                                       cell_cache_path=self.cell_cache_path, histogram=self.histogram)
+            results = pool.imap(worker, csv_files)
+            for file_path in csv_files:
+                # Tunggu hasil berikutnya sambil tetap memeriksa cancel_event
+                start = time.perf_counter()
+                while True:
+                    if self.is_cancelled():
+                        return
+                    try:
+                        processed_df, stats = results.next(timeout=0.5)
+                        break
+                    except mp.TimeoutError:
+                        continue
+                self.add_timing('worker_wait', time.perf_counter() - start)
+                
+                # Waktu read/transform diukur di worker process
+                self.add_timing('read', stats['read_seconds'], stats['read_cpu'], stats['rows_read'])
+                self.add_timing('transform', stats['transform_seconds'], stats['transform_cpu'], stats['rows_read'])
+                self.update_file_stats(file_path, read_seconds=stats['read_seconds'],
+                                       transform_seconds=stats['transform_seconds'],
+                                       rows_read=stats['rows_read'])
+                if processed_df is None:
+                    yield file_path, _FILE_FAILED
+                    continue
+                self.update_file_stats(file_path, rows_processed=len(processed_df))
+                if self.progress is not None:
+                    self.progress.add(rows_transformed=len(processed_df))
+                yield file_path, processed_df
+                yield file_path, None
+            
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+    
+    def _iter_checkpoint(self, csv_files):
+        """Replay processed frames of files completed in the checkpoint"""
+        for file_path in csv_files:
+            if self.is_cancelled():
+                return
+            rows = 0
+            for processed_df in self.checkpoint.load_frames(file_path):
+                rows += len(processed_df)
+                self.update_file_stats(file_path, rows_processed=len(processed_df))
+                if self.progress is not None:
+                    self.progress.add(rows_transformed=len(processed_df))
+                yield file_path, processed_df
+            print(f"[INFO] {os.path.basename(file_path)}: {rows} baris dari checkpoint")
+            yield file_path, None
+    
+    def _iter_checkpointed(self, csv_files):
+        """
+        Files completed in the checkpoint are replayed, the rest is read and
+        transformed; their frames are saved to the checkpoint as they pass
+        """
+        completed = self.checkpoint.completed_files()
+        restored = [f for f in csv_files if os.path.abspath(f) in completed]
+        remaining = [f for f in csv_files if os.path.abspath(f) not in completed]
+        if restored:
+            print(f"[INFO] Melanjutkan dari checkpoint: {len(restored)} file sudah diproses sebelumnya")
+        
+        yield from self._iter_checkpoint(restored)
+        if not remaining:
+            return
+        
+        for file_path in remaining:
+            self.checkpoint.discard_partial(file_path)
+        processed = self._iter_processed(remaining)
+        try:
+            for file_path, processed_df in processed:
+                if processed_df is None:
+                    self.checkpoint.file_completed(file_path)
+                elif processed_df is not _FILE_FAILED:
+                    self.checkpoint.save_frame(file_path, processed_df)
+                yield file_path, processed_df
+        finally:
+            processed.close()
+    
+    def _iter_processed(self, csv_files):
+        workers = self.workers
+        if workers is None:
+            workers = get_worker_count(csv_files)
+        workers = min(workers, len(csv_files))
+        
+        # Mode chunk selalu streaming: worker pool mengembalikan satu frame per
+        # file sehingga memori kembali sebesar file utuh per worker
+        if self.chunksize and workers > 1:
+            print(f"[INFO] Mode chunk ({self.chunksize} baris): file diproses streaming tanpa worker pool")
+            workers = 1
+        
+        if workers <= 1:
+            return self._iter_sequential(csv_files)
+        return self._iter_pool(csv_files, workers)
+    
+    def iter_processed(self, csv_files):
+        """Reader + transformer stages, sequential or with a process pool"""
+        if self.checkpoint is not None:
+            return self._iter_checkpointed(csv_files)
+        return self._iter_processed(csv_files)
+    
+    def run(self, csv_files):
+        """
+        Run pipeline over files and feed every processed frame to all sinks.
+        Returns total processed rows, or None on failure or cancel.
+        """
+        self.completed_files = []
+        self.total_rows = 0
+        self.cancelled = False
+        self.stage_timings = {}
+        self.stage_cpu = {}
+        self.stage_rows = {}
+        self.file_stats = {}
+        
+        for sink in self.sinks:
+            sink.open()
+        
+        failed = False
+        processed = self.iter_processed(csv_files)
+        try:
+            for file_path, processed_df in processed:
+                if processed_df is _FILE_FAILED:
+                    # File gagal tidak dicatat selesai, tetapi progress tetap maju
+                    if self.progress is not None:
+                        self.progress.file_done(file_path)
+                    continue
+                if processed_df is None:
+                    self.completed_files.append(file_path)
+                    self.update_file_stats(file_path, completed=True)
+                    if self.progress is not None:
+                        self.progress.file_done(file_path)
+                    continue
+                
+                output_df = processed_df
+                if self.histogram:
+                    output_df = processed_df.drop(columns=HISTOGRAM_COLS, errors='ignore')
+                for sink in self.sinks:
+                    start = time.perf_counter()
+                    cpu_start = time.thread_time()
+                    sink.write(processed_df if getattr(sink, 'wants_histogram', False) else output_df)
+                    self.add_timing(f"sink_{sink.name}", time.perf_counter() - start,
+                                    time.thread_time() - cpu_start, len(processed_df))
+                self.total_rows += len(processed_df)
+                
+        except Exception as e:
+            print(f"[ERROR] Error pada pipeline: {str(e)}")
+            failed = True
+        finally:
+            processed.close()
+        
+        # Simpan atribut cell baru (mode sequential; worker pool menyimpan sendiri)
+        if self.cell_cache_path:
+            try:
+                get_cell_cache(self.cell_cache_path).save()
+            except Exception as e:
+                print(f"[WARNING] Gagal menyimpan cache dimensi cell: {str(e)}")
         
-        # Save to CSV
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(DEFAULT_OUTPUT_PATH, f"TA_processed_{timestamp}.csv")
-        final_df.to_csv(output_file, index=False)
-        print(f"[SUCCESS] Data disimpan ke: {output_file}")
-        
-        # Upload to database if requested
-        if upload_to_db and engine is not None:
-            print("[INFO] Memulai upload ke database...")
-            upload_success = upload_to_database(final_df, engine)
-            if upload_success:
-                print("[SUCCESS] Upload database berhasil")
-            else:
-                print("[ERROR] Upload database gagal")
-                return False
+        # Tutup sink; sink database menunggu upload yang masih berjalan
+        for sink in self.sinks:
+            start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"[ERROR] Error pada sink {sink.name}: {str(e)}")
+                failed = True
+            self.add_timing(f"sink_{sink.name}", time.perf_counter() - start, time.thread_time() - cpu_start)
+            if getattr(sink, 'busy_seconds', 0):
+                # Waktu kerja writer database di background thread
+                self.add_timing('upload', sink.busy_seconds, sink.busy_cpu_seconds, sink.rows)
+        
+        if failed:
+            return None
         
-        end_time = time.time()
-        duration = end_time - start_time
-        print("="*50)
-        print("PEMROSESAN SELESAI")
-        print(f"Total waktu: {format_duration(duration)}")
-        print(f"Data diproses: {len(final_df)} baris")
-        print(f"Output file: {output_file}")
-        if upload_to_db:
-            print("Database: Upload berhasil")
-        print("="*50)
+        # Cancel bisa datang saat writer database masih mengosongkan antrian
+        if any(getattr(sink, 'cancelled', False) for sink in self.sinks):
+            self.cancelled = True
+        if self.is_cancelled():
+            print("[INFO] Proses dibatalkan oleh user")
+            return None
         
-        return True
+        if self.total_rows == 0:
+            print("[ERROR] Tidak ada data yang berhasil diproses dari semua file")
+            return None
         
-    except Exception as e:
-        print(f"[ERROR] Error dalam process_ta_data: {str(e)}")
-        return False
+        if self.progress is not None:
+            self.progress.finish()
+        print(f"[INFO] Total data yang diproses: {self.total_rows} baris")
+        self.print_stage_timings()
+        return self.total_rows
+    
+    def print_stage_timings(self):
+        """Print time spent per stage"""
+        if self.stage_timings:
+            timings = ', '.join(f"{stage}: {format_duration(seconds)}"
+                                for stage, seconds in self.stage_timings.items())
+            print(f"[INFO] Waktu per stage - {timings}")
+    
+    def stage_report(self):
+        """Per-stage wall/CPU time, rows and rows per second"""
+        report = {}
+        for stage, seconds in self.stage_timings.items():
+            rows = self.stage_rows.get(stage)
+            report[stage] = {
+                'wall_seconds': round(seconds, 4),
+                'cpu_seconds': round(self.stage_cpu[stage], 4) if stage in self.stage_cpu else None,
+                'rows': rows,
+                'rows_per_sec': round(rows / seconds, 1) if rows and seconds > 0 else None,
+            }
+        return report
+
+_LAST_RUN_REPORT = None
+
+def get_last_run_report():
+    """Return run report (dict) of the last processing run in this process"""
+    return _LAST_RUN_REPORT
+
+def format_run_report(report):
+    """Format run report as readable log lines"""
+    lines = [
+        f"Total waktu: {format_duration(report['wall_seconds'])} "
+        f"(CPU {format_duration(report['cpu_seconds'])}), peak memori {report['peak_rss_bytes'] / 1024 / 1024:.0f} MB",
+        f"Data dibaca: {report['bytes_read'] / 1024 / 1024:.1f} MB dari {len(report['files'])} file, "
+        f"{report['total_rows']} baris diproses",
+    ]
+    for stage, stats in report['stages'].items():
+        line = f"  {stage}: {format_duration(stats['wall_seconds'])}"
+        if stats['cpu_seconds'] is not None:
+            line += f", CPU {format_duration(stats['cpu_seconds'])}"
+        if stats['rows_per_sec']:
+            line += f", {stats['rows_per_sec']:.0f} baris/detik"
+        lines.append(line)
+    for file_stats in report['files']:
+        lines.append(f"  {file_stats['file']}: {file_stats['rows_processed']} baris, "
+                     f"read {format_duration(file_stats['read_seconds'])}, "
+                     f"transform {format_duration(file_stats['transform_seconds'])}")
+    return lines
 
-def process_ta_data_test(input_path, cancel_event=None):
+def write_run_report(pipeline, monitor, input_path, output_file, discovery_seconds, start_time, success):
     """
-    Test mode processing - save to CSV only, no database upload
+    Build run report from pipeline statistics and save it as JSON next to the
+    output CSV. A failed write only gives a warning (report_file is None).
+    """
+    global _LAST_RUN_REPORT
+    
+    stages = {'discovery': {'wall_seconds': round(discovery_seconds, 4), 'cpu_seconds': None,
+                            'rows': None, 'rows_per_sec': None}}
+    stages.update(pipeline.stage_report())
+    files = [{key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+             for stats in pipeline.file_stats.values()]
+    
+    report = {
+        'started_at': datetime.fromtimestamp(start_time).strftime("%Y-%m-%d %H:%M:%S"),
+        'finished_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'input_path': input_path,
+        'output_file': output_file,
+        'success': success,
+        'total_rows': pipeline.total_rows,
+        'wall_seconds': round(time.time() - start_time, 4),
+        'cpu_seconds': round(monitor.cpu_seconds, 4),
+        'peak_rss_bytes': monitor.peak_rss,
+        'bytes_read': sum(f['bytes'] for f in files),
+        'stages': stages,
+        'files': files,
+    }
+    
+    report_file = os.path.splitext(output_file)[0] + "_report.json"
+    try:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"[WARNING] Gagal menyimpan run report {report_file}: {str(e)}")
+        report_file = None
+    report['report_file'] = report_file
+    _LAST_RUN_REPORT = report
+    
+    for line in format_run_report(report):
+        print(f"[INFO] {line}")
+    if report_file:
+        print(f"[INFO] Run report disimpan ke: {report_file}")
+    return report
+
+def _run_processing(input_path, test_mode, upload_to_db=False, cancel_event=None, workers=None,
+                    chunksize=None, incremental=False, force=False, delta=False, columnar_format=None,
+                    db_writers=DEFAULT_DB_WRITERS, progress_callback=None, checkpoint=False,
+                    histogram=False, cube=False, output_dir=None):
     """
+    Shared implementation of process_ta_data and process_ta_data_test
+    """
+    global _LAST_RUN_REPORT
+    function_name = "process_ta_data_test" if test_mode else "process_ta_data"
+    mode_suffix = " - TEST MODE" if test_mode else ""
+    _LAST_RUN_REPORT = None
     try:
         start_time = time.time()
         print("="*50)
-        print("MEMULAI PEMROSESAN DATA TA - TEST MODE")
+        print(f"MEMULAI PEMROSESAN DATA TA{mode_suffix}")
         print("="*50)
         
         # Create output directory
-        os.makedirs(DEFAULT_OUTPUT_PATH, exist_ok=True)
+        output_dir = output_dir or DEFAULT_OUTPUT_PATH
+        os.makedirs(output_dir, exist_ok=True)
         
-        # Determine if input is file or directory
-        if os.path.isfile(input_path):
-            csv_files = [input_path]
-            print(f"[INFO] Memproses single file: {os.path.basename(input_path)}")
-        else:
-            csv_files = [os.path.join(input_path, f) for f in os.listdir(input_path) 
-                        if f.lower().endswith('.csv')]
-            print(f"[INFO] Memproses {len(csv_files)} file CSV dari folder")
+        # Manifest mencatat file per target upload; tanpa upload tidak ada yang dicatat
+        if incremental and not upload_to_db:
+            print("[ERROR] Mode incremental membutuhkan upload database")
+            return False
         
+        discovery_start = time.perf_counter()
+        csv_files = discover_csv_files(input_path)
         if not csv_files:
             print("[ERROR] Tidak ada file CSV ditemukan")
             return False
         
-        all_processed_data = []
+        # Lewati file yang sudah diproses pada run sebelumnya
+        file_info = {}
+        if incremental:
+            csv_files, file_info = filter_new_files(csv_files, force=force, output_dir=output_dir)
+            if not csv_files:
+                print("[INFO] Tidak ada file baru atau berubah untuk diproses")
+                return True
+        discovery_seconds = time.perf_counter() - discovery_start
         
-        # Process each file
-        for file_path in csv_files:
-            try:
-                if cancel_event and cancel_event.is_set():
-                    print("[INFO] Proses dibatalkan oleh user")
-                    return False
-                
-                print(f"[INFO] Memproses file: {os.path.basename(file_path)}")
-                
-                # Read CSV
-                df = pd.read_csv(file_path)
-                print(f"[INFO] Membaca {len(df)} baris dari {os.path.basename(file_path)}")
-                
-                # Process data
-                processed_df = process_ericsson_data(df)
-                if processed_df is not None and not processed_df.empty:
-                    all_processed_data.append(processed_df)
-                    print(f"[SUCCESS] Berhasil memproses {len(processed_df)} baris")
-                else:
-                    print(f"[WARNING] Tidak ada data yang berhasil diproses dari {os.path.basename(file_path)}")
-                
-            except Exception as e:
-                print(f"[ERROR] Error processing {os.path.basename(file_path)}: {str(e)}")
-                continue
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_prefix = "TA_processed_TEST_" if test_mode else "TA_processed_"
+        output_file = os.path.join(output_dir, f"{output_prefix}{timestamp}.csv")
+        sinks = [CsvSink(output_file)]
+        progress = ProgressTracker(csv_files, callback=progress_callback, upload=upload_to_db)
+        
+        # Checkpoint: run yang sama (file dan pengaturan sama) dilanjutkan dari sini
+        run_checkpoint = None
+        if checkpoint:
+            run_checkpoint = RunCheckpoint(csv_files, settings={
+                'test_mode': test_mode, 'upload_to_db': upload_to_db, 'delta': delta,
+                'columnar_format': columnar_format, 'histogram': histogram, 'cube': cube,
+                'chunksize': chunksize, 'workers': workers,
+            }, output_dir=output_dir)
+        
+        # Output kolumnar (Parquet/Feather) dipartisi per DateId
+        if columnar_format:
+            partition_dir = os.path.join(output_dir, PARTITION_TEST_DIRNAME if test_mode else PARTITION_DIRNAME)
+            sinks.append(ColumnarSink(partition_dir, file_format=columnar_format))
+        
+        # Histogram harian per cell untuk persentil multi-hari (query_histogram_range)
+        if histogram:
+            sinks.append(HistogramSink(get_histogram_dir(output_dir, test_mode=test_mode)))
+        if cube:
+            sinks.append(CubeSink(get_cube_dir(output_dir, test_mode=test_mode)))
         
-        if not all_processed_data:
-            print("[ERROR] Tidak ada data yang berhasil diproses dari semua file")
-            return False
+        # Database connection
+        if upload_to_db:
+            engine = create_db_connection()
+            if engine is None:
+                print("[ERROR] Gagal koneksi database, proses dibatalkan")
+                return False
+            sinks.append(DatabaseSink(engine, delta=delta, writers=db_writers, progress=progress,
+                                      checkpoint=run_checkpoint, cancel_event=cancel_event))
         
-        # Combine all data
-        final_df = pd.concat(all_processed_data, ignore_index=True)
-        print(f"[INFO] Total data yang diproses: {len(final_df)} baris")
+        pipeline = TAPipeline(sinks, workers=workers, chunksize=chunksize, cancel_event=cancel_event,
+                              cell_cache_path=get_cell_cache_path(output_dir), progress=progress,
+                              checkpoint=run_checkpoint, histogram=histogram or cube)
+        monitor = ResourceMonitor().start()
+        try:
+            total_rows = pipeline.run(csv_files)
+        finally:
+            monitor.stop()
+        # Laporan hanya informasi: kegagalan di sini tidak menggagalkan run
+        try:
+            write_run_report(pipeline, monitor, input_path, output_file, discovery_seconds,
+                             start_time, success=total_rows is not None)
+        except Exception as e:
+            print(f"[WARNING] Gagal membuat run report: {str(e)}")
+        if total_rows is None:
+            if run_checkpoint is not None:
+                run_checkpoint.close()
+                print(f"[INFO] Checkpoint disimpan di {run_checkpoint.directory}; "
+                      f"jalankan ulang dengan input yang sama untuk melanjutkan")
+            return False
+        if run_checkpoint is not None:
+            run_checkpoint.discard()
         
-        # Save to CSV
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = os.path.join(DEFAULT_OUTPUT_PATH, f"TA_processed_TEST_{timestamp}.csv")
-        final_df.to_csv(output_file, index=False)
-        print(f"[SUCCESS] Data disimpan ke: {output_file}")
+        # Catat file yang berhasil diproses ke manifest
+        if incremental:
+            record_processed_files(pipeline.completed_files, file_info, output_dir=output_dir)
         
         end_time = time.time()
         duration = end_time - start_time
         print("="*50)
-        print("PEMROSESAN SELESAI - TEST MODE")
+        print(f"PEMROSESAN SELESAI{mode_suffix}")
         print(f"Total waktu: {format_duration(duration)}")
-        print(f"Data diproses: {len(final_df)} baris")
+        print(f"Data diproses: {total_rows} baris")
         print(f"Output file: {output_file}")
-        print("Database: Tidak diupload (Test Mode)")
+        if test_mode:
+            print("Database: Tidak diupload (Test Mode)")
+        elif upload_to_db:
+            print("Database: Upload berhasil")
         print("="*50)
         
         return True
         
     except Exception as e:
-        print(f"[ERROR] Error dalam process_ta_data_test: {str(e)}")
-        return False 
\ No newline at end of file
+        print(f"[ERROR] Error dalam {function_name}: {str(e)}")
+        return False
+
+def process_ta_data(input_path, upload_to_db=True, cancel_event=None, workers=None, chunksize=None,
+                    incremental=False, force=False, delta=False, columnar_format=None,
+                    db_writers=DEFAULT_DB_WRITERS, progress_callback=None, checkpoint=False, histogram=False,
+                    cube=False, output_dir=None):
+    """
+    Main function to process TA data with database upload.
+    Output files go to output_dir (default DEFAULT_OUTPUT_PATH).
+    With incremental=True only files that are new or changed since the last
+    successful upload to the same database table are processed (force=True
+    reprocesses all and refreshes the manifest); it requires upload_to_db.
+    With delta=True only rows whose values differ from the database are uploaded.
+    columnar_format ('parquet' or 'feather') also writes output partitioned by DateId.
+    Upload runs concurrently with parsing on db_writers writer threads.
+    progress_callback(snapshot) receives ProgressTracker snapshots (see format_progress).
+    Setting cancel_event stops the run after the current slice or upload batch.
+    With checkpoint=True (off by default, it pickles every processed frame)
+    processed files and committed upload batches are kept until the run
+    succeeds, so running it again resumes instead of starting over.
+    With histogram=True the raw daily histogram per cell is also stored (needs
+    pyarrow) for exact multi-day percentiles with query_histogram_range;
+    cube=True appends them to the local HistogramCube (memmap) instead/as well.
+    """
+    return _run_processing(input_path, test_mode=False, upload_to_db=upload_to_db,
+                           cancel_event=cancel_event, workers=workers, chunksize=chunksize,
+                           incremental=incremental, force=force, delta=delta,
+                           columnar_format=columnar_format, db_writers=db_writers,
+                           progress_callback=progress_callback, checkpoint=checkpoint,
+                           histogram=histogram, cube=cube, output_dir=output_dir)
+
+def process_ta_data_test(input_path, cancel_event=None, workers=None, chunksize=None, columnar_format=None,
+                         progress_callback=None, checkpoint=False, histogram=False, cube=False,
+                         output_dir=None):
+    """
+    Test mode processing - save to CSV only, no database upload
+    """
+    return _run_processing(input_path, test_mode=True, cancel_event=cancel_event,
+                           workers=workers, chunksize=chunksize, columnar_format=columnar_format,
+                           progress_callback=progress_callback, checkpoint=checkpoint,
+                           histogram=histogram, cube=cube, output_dir=output_dir)
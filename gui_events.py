@@ -0,0 +1,144 @@
+"""
+Event channel antara thread pemrosesan dan GUI Tkinter.
+Worker thread mengirim event (log, status, dialog, ...) ke queue; main loop
+Tk mengambilnya per batch dengan root.after. Output print() dari modul
+pemrosesan dialihkan ke channel dengan rate limiting dan agregasi pesan
+berulang, sehingga GUI tidak macet saat banyak warning.
+"""
+
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Maksimum baris log per detik dari print(); error selalu diteruskan
+DEFAULT_MAX_LINES_PER_SECOND = 50
+
+class EventChannel:
+    """
+    Thread-safe queue of structured events: dicts with 'kind', 'time' and
+    event-specific fields
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def post(self, kind, **data):
+        """Post an event (safe from any thread)"""
+        data['kind'] = kind
+        data['time'] = time.time()
+        self._queue.put(data)
+
+    def drain(self, max_events=500):
+        """Return up to max_events pending events without blocking"""
+        events = []
+        while len(events) < max_events:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+class ChannelWriter:
+    """
+    File-like object that turns printed lines into 'log' events. Identical
+    consecutive lines (e.g. a repeated warning) are aggregated into one
+    summary line, and lines above max_lines_per_second are dropped and
+    counted. ERROR lines are never aggregated or dropped.
+    """
+
+    def __init__(self, channel, max_lines_per_second=DEFAULT_MAX_LINES_PER_SECOND, echo=None):
+        self.channel = channel
+        self.max_lines_per_second = max_lines_per_second
+        self.echo = echo
+        self._lock = threading.Lock()
+        self._buffer = ''
+        self._last_key = None
+        self._repeats = 0
+        self._window_start = time.monotonic()
+        self._window_lines = 0
+        self._dropped = 0
+
+    @staticmethod
+    def _level(line):
+        match = re.match(r'\s*\[(\w+)\]', line)
+        return match.group(1).upper() if match else 'INFO'
+
+    def _post(self, line, level=None):
+        self.channel.post('log', message=line, level=level or self._level(line))
+        if self.echo is not None:
+            try:
+                self.echo.write(line + '\n')
+            except (OSError, IOError, AttributeError):
+                pass
+
+    def _flush_repeats(self):
+        if self._repeats:
+            self._post(f"    ... pesan serupa diulang {self._repeats} kali", level='INFO')
+        self._repeats = 0
+
+    def _flush_dropped(self):
+        if self._dropped:
+            self._post(f"[WARNING] {self._dropped} baris log dilewati (terlalu banyak pesan)", level='WARNING')
+        self._dropped = 0
+
+    def _emit(self, line):
+        if not line.strip():
+            return
+
+        # Hanya pesan yang persis sama dianggap berulang; error selalu tampil
+        level = self._level(line)
+        if level != 'ERROR' and line == self._last_key:
+            self._repeats += 1
+            return
+        self._flush_repeats()
+        self._last_key = line if level != 'ERROR' else None
+
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._flush_dropped()
+            self._window_start = now
+            self._window_lines = 0
+
+        if self._window_lines >= self.max_lines_per_second and level != 'ERROR':
+            self._dropped += 1
+            return
+        self._window_lines += 1
+        self._post(line, level)
+
+    def write(self, text):
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split('\n')
+            for line in lines:
+                self._emit(line)
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            self._flush_repeats()
+            self._flush_dropped()
+
+    def close(self):
+        with self._lock:
+            if self._buffer:
+                self._emit(self._buffer)
+                self._buffer = ''
+        self.flush()
+
+@contextmanager
+def redirect_output(channel, max_lines_per_second=DEFAULT_MAX_LINES_PER_SECOND):
+    """
+    Send sys.stdout (print output of all threads in this process) to the
+    channel while the block runs; output is still echoed to the original stdout
+    """
+    original = sys.stdout
+    writer = ChannelWriter(channel, max_lines_per_second=max_lines_per_second, echo=original)
+    sys.stdout = writer
+    try:
+        yield writer
+    finally:
+        sys.stdout = original
+        writer.close()
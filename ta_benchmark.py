@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+TA Daily Process Tool - Benchmark
+Benchmark pemrosesan TA dengan file CSV Ericsson sintetis
+
+Contoh:
+    python ta_benchmark.py --cells 20000 --days 3 --output bench.json
+    python ta_benchmark.py --cells 20000 --days 3 --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from TA_daily_process_module import (
+    TA_DISTR_COLS,
+    DB_CONFIG,
+    PERCENTILE_LEVELS,
+    read_ta_csv,
+    process_ericsson_data,
+    build_distr_count_matrix,
+    calculate_percentiles_vectorized,
+    upload_to_database,
+    to_plain_frame,
+)
+
+# Stage yang diukur, urutan sesuai pipeline
+BENCHMARK_STAGES = ['read', 'transform', 'percentile', 'csv_write', 'upload']
+
+def generate_synthetic_csv(file_path, cells=10000, days=1, skew=1.0, null_density=0.05,
+                           start_date="2025-01-01", seed=0):
+    """
+    Generate realistic Ericsson PM CSV (DATE_ID, ERBS, EUtranCellFDD,
+    pmTaInit2Distr_00..34). skew is the lognormal sigma of per-cell sample
+    volume (0 = all cells equal), null_density the fraction of '\\N' counters.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Nama site/cell: 3 sektor per site, beberapa carrier per sektor
+    site_count = max(1, cells // 6)
+    site_index = np.arange(cells) % site_count
+    erbs = np.array([f"JKT{i:05d}_ERBS" for i in range(site_count)], dtype=object)[site_index]
+    cell_names = np.array([f"JKT{s:05d}_L{18 if c % 2 else 9}{c // 2 % 3 + 1}"
+                           for c, s in enumerate(site_index)], dtype=object)
+
+    # Volume sampel per cell (lognormal, skew = sigma) dan profil TA menurun
+    volume = rng.lognormal(mean=8.0, sigma=skew, size=cells) if skew > 0 else np.full(cells, np.exp(8.0))
+    profile = np.exp(-np.arange(len(TA_DISTR_COLS)) / rng.uniform(1.5, 6.0, size=(cells, 1)))
+    profile /= profile.sum(axis=1, keepdims=True)
+
+    base_date = datetime.strptime(start_date, "%Y-%m-%d")
+    header = True
+    for day in range(days):
+        counts = rng.poisson(volume[:, None] * profile).astype(object)
+        counts[rng.random(counts.shape) < null_density] = '\\N'
+
+        df = pd.DataFrame(counts, columns=TA_DISTR_COLS)
+        df.insert(0, 'EUtranCellFDD', cell_names)
+        df.insert(0, 'ERBS', erbs)
+        df.insert(0, 'DATE_ID', (base_date + timedelta(days=day)).strftime("%Y-%m-%d"))
+
+        df.to_csv(file_path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+
+    return file_path
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def object_layout(df):
+    """
+    Processed frame in the previous layout (object strings, '\\N' sentinel in
+    percentile columns with missing values), for memory comparison
+    """
+    plain = to_plain_frame(df)
+    legacy = pd.DataFrame({col: plain[col].astype(object) for col in plain.columns})
+    for name, _ in PERCENTILE_LEVELS:
+        if plain[name].isna().any():
+            legacy[name] = plain[name].astype(object).where(plain[name].notna(), '\\N')
+        else:
+            legacy[name] = plain[name]
+    return legacy
+
+def memory_footprint(df):
+    """Deep memory usage (bytes) of compact vs previous object layout"""
+    compact_bytes = int(df.memory_usage(deep=True).sum())
+    object_bytes = int(object_layout(df).memory_usage(deep=True).sum())
+    return {
+        'compact_bytes': compact_bytes,
+        'object_bytes': object_bytes,
+        'ratio': object_bytes / compact_bytes if compact_bytes else None,
+    }
+
+def _upload_sqlite(df, db_path):
+    """SQLite stand-in for the MariaDB upsert (same key, same rows)"""
+    df_upload = to_plain_frame(df)
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = df_upload.columns.tolist()
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {DB_CONFIG['table']} "
+            f"({', '.join(columns)}, PRIMARY KEY (DateId, Cell))"
+        )
+        placeholders = ', '.join(['?'] * len(columns))
+        values = df_upload.astype(object).where(df_upload.notna(), None)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {DB_CONFIG['table']} ({', '.join(columns)}) VALUES ({placeholders})",
+            values.itertuples(index=False, name=None)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return True
+
+def run_benchmark(csv_path, db_url=None, repeat=1):
+    """
+    Time read, transform, percentile, CSV write and upload separately
+    (best of `repeat`). Upload goes to MariaDB when db_url is given,
+    otherwise to a temporary SQLite database.
+    """
+    timings = {stage: [] for stage in BENCHMARK_STAGES}
+    engine = None
+    if db_url:
+        from sqlalchemy import create_engine
+        engine = create_engine(db_url, connect_args={'local_infile': True})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(repeat):
+            df, seconds = _timed(read_ta_csv, csv_path)
+            timings['read'].append(seconds)
+
+            processed_df, seconds = _timed(process_ericsson_data, df)
+            timings['transform'].append(seconds)
+
+            _, seconds = _timed(lambda: calculate_percentiles_vectorized(build_distr_count_matrix(df)))
+            timings['percentile'].append(seconds)
+
+            _, seconds = _timed(processed_df.to_csv, os.path.join(tmp_dir, "out.csv"), index=False, na_rep='\\N')
+            timings['csv_write'].append(seconds)
+
+            if engine is not None:
+                _, seconds = _timed(upload_to_database, processed_df, engine)
+            else:
+                _, seconds = _timed(_upload_sqlite, processed_df, os.path.join(tmp_dir, "bench.sqlite"))
+            timings['upload'].append(seconds)
+
+    if engine is not None:
+        engine.dispose()
+
+    rows = len(df)
+    return {
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'rows': rows,
+        'input_bytes': os.path.getsize(csv_path),
+        'upload_target': 'mariadb' if db_url else 'sqlite',
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'memory': memory_footprint(processed_df),
+        'stages': {
+            stage: {
+                'seconds': min(values),
+                'rows_per_sec': rows / min(values) if min(values) > 0 else None,
+            }
+            for stage, values in timings.items()
+        },
+    }
+
+def compare_with_baseline(results, baseline, tolerance=0.2):
+    """
+    Compare stage timings with a stored baseline. Returns list of
+    (stage, baseline seconds, current seconds) that are slower than tolerance.
+    """
+    regressions = []
+    for stage, current in results['stages'].items():
+        previous = baseline.get('stages', {}).get(stage)
+        if not previous:
+            continue
+        if current['seconds'] > previous['seconds'] * (1 + tolerance):
+            regressions.append((stage, previous['seconds'], current['seconds']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TA Daily Process dengan data sintetis")
+    parser.add_argument('--cells', type=int, default=10000, help="Jumlah cell per hari")
+    parser.add_argument('--days', type=int, default=1, help="Jumlah hari")
+    parser.add_argument('--skew', type=float, default=1.0, help="Skew volume sampel (sigma lognormal)")
+    parser.add_argument('--null-density', type=float, default=0.05, help="Fraksi counter bernilai \\N")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Ulangi dan ambil waktu terbaik")
+    parser.add_argument('--input', help="Pakai file CSV ini, bukan data sintetis")
+    parser.add_argument('--db-url', help="SQLAlchemy URL MariaDB lokal untuk stage upload (default: SQLite)")
+    parser.add_argument('--output', help="Simpan hasil ke file JSON")
+    parser.add_argument('--baseline', help="File JSON baseline untuk deteksi regresi")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Toleransi regresi (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = args.input
+        if not csv_path:
+            csv_path = os.path.join(tmp_dir, "synthetic_ta.csv")
+            print(f"[INFO] Membuat data sintetis: {args.cells} cell x {args.days} hari")
+            generate_synthetic_csv(csv_path, cells=args.cells, days=args.days, skew=args.skew,
+                                   null_density=args.null_density, seed=args.seed)
+
+        results = run_benchmark(csv_path, db_url=args.db_url, repeat=args.repeat)
+
+    results['params'] = {
+        'cells': args.cells, 'days': args.days, 'skew': args.skew,
+        'null_density': args.null_density, 'seed': args.seed, 'input': args.input,
+    }
+
+    for stage, result in results['stages'].items():
+        print(f"[INFO] {stage:<10} {result['seconds']:.3f} detik")
+    memory = results['memory']
+    print(f"[INFO] Memori frame hasil: {memory['compact_bytes'] / 1024 / 1024:.1f} MB "
+          f"(layout object: {memory['object_bytes'] / 1024 / 1024:.1f} MB, {memory['ratio']:.1f}x)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"[SUCCESS] Hasil benchmark disimpan ke: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, tolerance=args.tolerance)
+        for stage, previous, current in regressions:
+            print(f"[ERROR] Regresi {stage}: {previous:.3f} -> {current:.3f} detik")
+        if regressions:
+            return 1
+        print("[SUCCESS] Tidak ada regresi terhadap baseline")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+TA Daily Process Tool - Command Line
+Menjalankan pemrosesan TA tanpa GUI (cron / scheduled batch di server Linux).
+Tidak membutuhkan tkinter, display maupun modul login.
+
+Contoh:
+    python ta_cli.py /data/ta/20250601 --output-dir /data/ta/output --workers 4
+    python ta_cli.py /data/ta/20250601 --no-db --report /var/log/ta/report.json
+
+Exit code:
+    0   berhasil (termasuk tidak ada file baru pada mode incremental)
+    1   pemrosesan atau upload gagal
+    2   argumen tidak valid
+    3   input tidak ditemukan / tidak ada file CSV
+    4   koneksi database gagal
+    130 dibatalkan (SIGINT/SIGTERM); dengan --checkpoint jalankan ulang untuk melanjutkan
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import TA_daily_process_module as ta
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_INPUT = 3
+EXIT_DB_UNAVAILABLE = 4
+EXIT_CANCELLED = 130
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Proses data TA daily Ericsson tanpa GUI")
+    parser.add_argument('input', help="File CSV atau folder berisi file CSV")
+    parser.add_argument('--output-dir', help=f"Folder output (default: {ta.DEFAULT_OUTPUT_PATH})")
+    parser.add_argument('--no-db', action='store_true', help="Test mode: hanya tulis CSV, tanpa upload database")
+    parser.add_argument('--workers', type=int, help="Jumlah worker process (default: otomatis)")
+    parser.add_argument('--chunk-size', type=int, help="Baca CSV per chunk dengan jumlah baris ini")
+    parser.add_argument('--report', help="Salin laporan run (JSON) ke file ini")
+    parser.add_argument('--incremental', action='store_true', help="Lewati file yang sudah pernah diproses")
+    parser.add_argument('--force', action='store_true', help="Dengan --incremental: proses ulang semua file")
+    parser.add_argument('--delta', action='store_true', help="Hanya upload baris yang berubah")
+    parser.add_argument('--db-writers', type=int, default=ta.DEFAULT_DB_WRITERS, help="Jumlah thread upload")
+    parser.add_argument('--columnar', choices=sorted(ta.COLUMNAR_FORMATS), help="Tulis juga output Parquet/Feather")
+    parser.add_argument('--histogram', action='store_true', help="Simpan histogram harian per cell")
+    parser.add_argument('--cube', action='store_true', help="Tambahkan histogram harian ke cube memmap lokal")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help="Simpan checkpoint agar run yang dibatalkan bisa dilanjutkan")
+    parser.add_argument('--maintain-partitions', action='store_true',
+                        help="Sebelum upload, tambahkan partisi DateId ke depan (user admin)")
+    parser.add_argument('--retention-days', type=int,
+                        help="Setelah upload, hapus partisi DateId yang lebih tua dari N hari")
+    parser.add_argument('--progress', action='store_true', help="Tampilkan progress berkala")
+    return parser
+
+def validate_args(parser, args):
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers minimal 1")
+    if args.chunk_size is not None and args.chunk_size < 1:
+        parser.error("--chunk-size minimal 1")
+    if args.db_writers < 1:
+        parser.error("--db-writers minimal 1")
+    if args.no_db and (args.incremental or args.delta or args.maintain_partitions
+                       or args.retention_days is not None):
+        parser.error("--incremental, --delta, --maintain-partitions dan --retention-days membutuhkan upload database")
+    if args.force and not args.incremental:
+        parser.error("--force hanya berlaku dengan --incremental")
+    if args.retention_days is not None and args.retention_days < 1:
+        parser.error("--retention-days minimal 1")
+
+def install_cancel_handlers(cancel_event):
+    """SIGINT/SIGTERM stop the run after the current batch instead of killing it"""
+    def handler(signum, frame):
+        if cancel_event.is_set():
+            raise KeyboardInterrupt
+        print(f"[WARNING] Sinyal {signal.Signals(signum).name} diterima, menghentikan proses...")
+        cancel_event.set()
+
+    signal.signal(signal.SIGINT, handler)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handler)
+
+def save_report(report_path):
+    report = ta.get_last_run_report()
+    if report is None:
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Laporan run disimpan ke: {report_path}")
+    return True
+
+def apply_retention(retention_days):
+    engine = ta.create_admin_db_connection()
+    if engine is None:
+        return False
+    cutoff = datetime.now().date() - timedelta(days=retention_days)
+    try:
+        ta.drop_partitions_before(engine, cutoff)
+    except Exception as e:
+        print(f"[ERROR] Gagal menerapkan retensi: {str(e)}")
+        return False
+    return True
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    validate_args(parser, args)
+
+    if not os.path.exists(args.input):
+        print(f"[ERROR] Input tidak ditemukan: {args.input}")
+        return EXIT_NO_INPUT
+    if not ta.discover_csv_files(args.input):
+        print(f"[ERROR] Tidak ada file CSV di: {args.input}")
+        return EXIT_NO_INPUT
+
+    upload = not args.no_db
+    if upload and ta.create_db_connection() is None:
+        return EXIT_DB_UNAVAILABLE
+    # Perubahan skema hanya atas permintaan; gagal menambah partisi tidak menghentikan upload
+    if args.maintain_partitions:
+        ta.maintain_partitions()
+
+    cancel_event = threading.Event()
+    install_cancel_handlers(cancel_event)
+    progress_callback = None
+    if args.progress:
+        progress_callback = lambda snapshot: print(f"[INFO] Progress: {ta.format_progress(snapshot)}", flush=True)
+
+    # Semua output run (CSV, manifest, cache, checkpoint, histogram) ke folder ini
+    options = dict(output_dir=args.output_dir, cancel_event=cancel_event, workers=args.workers,
+                   chunksize=args.chunk_size,
+                   columnar_format=args.columnar, progress_callback=progress_callback,
+                   checkpoint=args.checkpoint, histogram=args.histogram, cube=args.cube)
+    if upload:
+        success = ta.process_ta_data(args.input, upload_to_db=True, incremental=args.incremental,
+                                     force=args.force, delta=args.delta, db_writers=args.db_writers, **options)
+    else:
+        success = ta.process_ta_data_test(args.input, **options)
+
+    # Statistik run sudah dicetak oleh modul (write_run_report)
+    if args.report and not save_report(args.report):
+        print("[WARNING] Tidak ada laporan run untuk disimpan")
+
+    if cancel_event.is_set():
+        return EXIT_CANCELLED
+    if not success:
+        return EXIT_FAILED
+    if args.retention_days is not None and not apply_retention(args.retention_days):
+        return EXIT_FAILED
+    return EXIT_OK
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
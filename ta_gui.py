@@ -15,18 +15,22 @@ import threading
 from datetime import datetime, timedelta
 import sys
 import ctypes
+import multiprocessing
 
 # Import modul TA processing
 try:
     from TA_daily_process_module import (
         process_ta_data, 
         process_ta_data_test, 
+        format_progress,
         DEFAULT_OUTPUT_PATH, 
         create_db_connection,
         create_admin_db_connection,
+        clear_database,
+        dispose_engines,
         DB_ADMIN_CONFIG
     )
-    from sqlalchemy import text
+    from gui_events import EventChannel, redirect_output
 except ImportError as e:
     print(f"Error importing TA module: {e}")
     sys.exit(1)
@@ -150,6 +154,9 @@ def login_menu():
     return result['username'], result['password']
 
 class TAProcessorGUI:
+    # Interval pengambilan event dari worker thread (ms)
+    EVENT_POLL_MS = 100
+    
     def __init__(self, root, username):
         self.root = root
         self.username = username
@@ -164,9 +171,18 @@ class TAProcessorGUI:
         self.input_path = tk.StringVar()
         self.output_folder = tk.StringVar(value=DEFAULT_OUTPUT_PATH)
         self.upload_to_db = tk.BooleanVar(value=True)
+        self.incremental = tk.BooleanVar(value=False)
+        self.delta_upload = tk.BooleanVar(value=False)
+        self.save_histogram = tk.BooleanVar(value=False)
         self.is_processing = False
+        self.is_closing = False
+        self.cancel_event = threading.Event()
+        
+        # Event dari thread pemrosesan, diambil per batch oleh main loop Tk
+        self.events = EventChannel()
         
         self.setup_ui()
+        self.root.after(self.EVENT_POLL_MS, self.drain_events)
     
     def center_window(self):
         """Center the main window on screen with consistent positioning"""
@@ -289,6 +305,21 @@ class TAProcessorGUI:
                  bg="#BF616A", fg="white", font=("Arial", 9))
         clear_btn.pack(side=tk.RIGHT)
         
+        # Incremental option
+        tk.Checkbutton(options_frame, text="Lewati file yang sudah pernah diupload (incremental)", 
+                      variable=self.incremental,
+                      font=("Arial", 10)).pack(anchor=tk.W)
+        
+        # Delta upload option
+        tk.Checkbutton(options_frame, text="Hanya upload baris yang berubah (delta upload)", 
+                      variable=self.delta_upload,
+                      font=("Arial", 10)).pack(anchor=tk.W)
+        
+        # Histogram harian untuk persentil multi-hari (Days Range)
+        tk.Checkbutton(options_frame, text="Simpan histogram harian (persentil Days Range exact)", 
+                      variable=self.save_histogram,
+                      font=("Arial", 10)).pack(anchor=tk.W)
+        
         # Info about database
         db_info = tk.Label(options_frame, 
                           text="✓ Upload: Hasil akan disimpan ke database + file CSV\n"
@@ -322,13 +353,25 @@ class TAProcessorGUI:
                                        height=2)
         self.process_button.pack(fill=tk.X)
         
+        self.cancel_button = tk.Button(process_frame, text="⏹ BATALKAN", 
+                                      command=self.cancel_processing,
+                                      bg="#BF616A", fg="white", 
+                                      font=("Arial", 10, "bold"), 
+                                      state='disabled')
+        self.cancel_button.pack(fill=tk.X, pady=(5, 0))
+        
         # Progress bar
         progress_frame = tk.Frame(main_frame)
         progress_frame.pack(fill=tk.X, pady=5)
         
-        self.progress = ttk.Progressbar(progress_frame, mode='indeterminate')
+        self.progress = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
         self.progress.pack(fill=tk.X)
         
+        # Throughput dan perkiraan sisa waktu
+        self.progress_var = tk.StringVar(value="")
+        tk.Label(progress_frame, textvariable=self.progress_var, anchor=tk.W,
+                 font=("Arial", 9)).pack(fill=tk.X)
+        
         # Log section
         log_frame = tk.LabelFrame(main_frame, text="📋 Log Pemrosesan", 
                                  font=("Arial", 11, "bold"), padx=10, pady=10)
@@ -615,8 +658,14 @@ Email: hadifauzanhanif@gmail.com
                     confirm_text = f"Yakin ingin menghapus data untuk Site ID: {site_id_value}?"
                 
                 if messagebox.askyesno("Konfirmasi Final", confirm_text):
+                    # Index SiteId hanya dibuat jika user setuju (ALTER TABLE pada tabel produksi)
+                    create_index = option == "site" and messagebox.askyesno("Index SiteId",
+                        "Buat index SiteId jika belum ada?\n\n"
+                        "Ini mengubah struktur tabel (ALTER TABLE online, sekali saja).\n"
+                        "Tanpa index, hapus per Site ID memindai seluruh tabel.")
                     clear_window.destroy()
-                    self.execute_database_clear(option, from_date_value, to_date_value, site_id_value)
+                    self.execute_database_clear(option, from_date_value, to_date_value, site_id_value,
+                                                create_index)
                     
             def cancel_clear():
                 self.log("❌ User membatalkan clear database")
@@ -638,63 +687,125 @@ Email: hadifauzanhanif@gmail.com
             self.log(f"Traceback: {traceback.format_exc()}")
             messagebox.showerror("Error", f"Error dalam show_clear_database_menu:\n{str(e)}")
         
-    def execute_database_clear(self, option, from_date, to_date, site_id):
-        """Execute database clear operation"""
+    def execute_database_clear(self, option, from_date, to_date, site_id, create_index=False):
+        """Start database clear in background thread (batched, can be cancelled)"""
+        if self.is_processing:
+            messagebox.showwarning("Warning", "Pemrosesan sedang berjalan!")
+            return
+        
+        self.is_processing = True
+        self.process_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.cancel_event.clear()
+        self.progress['value'] = 0
+        self.progress_var.set("")
+        thread = threading.Thread(target=self.database_clear_thread,
+                                  args=(option, from_date, to_date, site_id, create_index))
+        thread.daemon = True
+        thread.start()
+    
+    def database_clear_thread(self, option, from_date, to_date, site_id, create_index=False):
+        """Execute database clear operation (runs in separate thread)"""
         try:
             self.log("="*50)
             self.log("🗑️ MEMULAI OPERASI CLEAR DATABASE")
             self.log(f"🗄️ Database: {DB_ADMIN_CONFIG['database']}.{DB_ADMIN_CONFIG['table']}")
             
-            engine = create_admin_db_connection()
+            with redirect_output(self.events):
+                engine = create_admin_db_connection()
             if engine is None:
                 self.log("❌ Gagal koneksi ke database dengan user admin")
-                messagebox.showerror("Error", "Gagal koneksi ke database dengan user admin")
+                self.show_dialog('error', "Error", "Gagal koneksi ke database dengan user admin")
                 return
             
-            # Build query based on option
-            table_name = DB_ADMIN_CONFIG['table']
             if option == "all":
-                query = f"DELETE FROM {table_name}"
                 self.log("🗑️ Menghapus SEMUA data...")
             elif option == "date":
-                query = f"DELETE FROM {table_name} WHERE DateId BETWEEN %s AND %s"
                 self.log(f"🗑️ Menghapus data dari {from_date} sampai {to_date}...")
             else:  # site
-                query = f"DELETE FROM {table_name} WHERE SiteId = %s"
                 self.log(f"🗑️ Menghapus data untuk Site ID: {site_id}...")
+            self.update_status("Menghapus data...")
             
-            # Execute query
-            with engine.begin() as conn:
-                if option == "all":
-                    result = conn.execute(text(query))
-                elif option == "date":
-                    result = conn.execute(text(query), (from_date, to_date))
-                else:  # site
-                    result = conn.execute(text(query), (site_id,))
-                
-                rows_affected = result.rowcount
-                
-            self.log(f"✅ Berhasil menghapus {rows_affected} baris data")
+            def on_progress(deleted, total):
+                fraction = min(deleted / total, 1.0) if total else 1.0
+                self.events.post('progress_text', fraction=fraction,
+                                 text=f"{deleted} / {total} baris dihapus")
+            
+            with redirect_output(self.events):
+                result = clear_database(engine, option, from_date=from_date, to_date=to_date,
+                                        site_id=site_id, cancel_event=self.cancel_event,
+                                        progress_callback=on_progress, create_index=create_index)
+            
+            rows_text = f"{'±' if result['approximate'] else ''}{result['deleted']}"
+            if result['cancelled']:
+                self.log(f"⏹ Clear database dibatalkan setelah menghapus {rows_text} baris")
+                self.update_status("⏹ Clear database dibatalkan")
+                return
+            
+            self.log(f"✅ Berhasil menghapus {rows_text} baris data (metode: {result['method']})")
             self.log("="*50)
+            self.update_status("✅ Clear database selesai")
             
-            messagebox.showinfo("Success", f"Berhasil menghapus {rows_affected} baris data dari database\n\nDatabase: {DB_ADMIN_CONFIG['database']}.{DB_ADMIN_CONFIG['table']}")
+            self.show_dialog('info', "Success", f"Berhasil menghapus {rows_text} baris data dari database\n\nDatabase: {DB_ADMIN_CONFIG['database']}.{DB_ADMIN_CONFIG['table']}")
             
         except Exception as e:
             self.log(f"❌ Error saat clear database: {str(e)}")
-            messagebox.showerror("Error", f"Gagal clear database:\n{str(e)}")
+            self.show_dialog('error', "Error", f"Gagal clear database:\n{str(e)}")
+        
+        finally:
+            self.events.post('finished')
         
     def log(self, message):
-        """Add message to log"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
-        self.log_text.insert(tk.END, log_message)
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        """Add message to log (safe from any thread)"""
+        self.events.post('log', message=message)
         
     def update_status(self, status):
-        """Update status bar"""
-        self.status_var.set(status)
-        self.root.update_idletasks()
+        """Update status bar (safe from any thread)"""
+        self.events.post('status', status=status)
+    
+    def show_dialog(self, level, title, message):
+        """Show messagebox from the Tk main loop (safe from any thread)"""
+        self.events.post('dialog', level=level, title=title, message=message)
+    
+    def drain_events(self):
+        """Apply pending worker events in one batch, then reschedule"""
+        try:
+            log_lines = []
+            for event in self.events.drain():
+                kind = event['kind']
+                if kind == 'log':
+                    timestamp = datetime.fromtimestamp(event['time']).strftime("%H:%M:%S")
+                    log_lines.append(f"[{timestamp}] {event['message']}\n")
+                    continue
+                
+                # Tulis log yang terkumpul sebelum event lain agar urutan terjaga
+                if log_lines:
+                    self.log_text.insert(tk.END, ''.join(log_lines))
+                    log_lines = []
+                if kind == 'status':
+                    self.status_var.set(event['status'])
+                elif kind == 'progress_text':
+                    self.progress['value'] = event['fraction'] * 100
+                    self.progress_var.set(event['text'])
+                elif kind == 'progress':
+                    snapshot = event['snapshot']
+                    self.progress['value'] = snapshot['fraction'] * 100
+                    self.progress_var.set(format_progress(snapshot))
+                elif kind == 'dialog':
+                    self.log_text.see(tk.END)
+                    show = {'info': messagebox.showinfo, 'warning': messagebox.showwarning,
+                            'error': messagebox.showerror}[event['level']]
+                    show(event['title'], event['message'])
+                elif kind == 'finished':
+                    self.is_processing = False
+                    self.process_button.config(state='normal')
+                    self.cancel_button.config(state='disabled')
+            
+            if log_lines:
+                self.log_text.insert(tk.END, ''.join(log_lines))
+                self.log_text.see(tk.END)
+        finally:
+            self.root.after(self.EVENT_POLL_MS, self.drain_events)
         
     def auto_detect_files(self):
         """Auto-detect sample files in current directory"""
@@ -776,34 +887,41 @@ Email: hadifauzanhanif@gmail.com
             
         return True
         
-    def processing_thread(self):
-        """Run processing in separate thread"""
+    def processing_thread(self, input_path, output_folder, upload_db, incremental, delta, histogram):
+        """
+        Run processing in separate thread. Settings are read from the Tk
+        variables beforehand; GUI updates go through self.events.
+        """
         try:
-            self.is_processing = True
-            self.process_button.config(state='disabled')
-            self.progress.start()
-            
             self.log("="*60)
             self.log("🚀 MEMULAI PEMROSESAN DATA TA")
             self.log("="*60)
             
-            input_path = self.input_path.get()
-            upload_db = self.upload_to_db.get()
-            
             # Log configuration
             self.log(f"📄 Input: {os.path.basename(input_path)}")
-            self.log(f"📁 Output: {self.output_folder.get()}")
+            self.log(f"📁 Output: {output_folder}")
             self.log(f"🗄️ Upload DB: {'Ya' if upload_db else 'Tidak (Test Mode)'}")
             
             self.update_status("Memproses data TA...")
             
-            # Call processing function
-            if upload_db:
-                success = process_ta_data(input_path, upload_to_db=True)
-            else:
-                success = process_ta_data_test(input_path)
+            # Call processing function; output print() modul masuk ke log GUI
+            with redirect_output(self.events):
+                on_progress = lambda snapshot: self.events.post('progress', snapshot=snapshot)
+                if upload_db:
+                    success = process_ta_data(input_path, upload_to_db=True, output_dir=output_folder,
+                                              cancel_event=self.cancel_event, checkpoint=True,
+                                              incremental=incremental, delta=delta,
+                                              progress_callback=on_progress, histogram=histogram)
+                else:
+                    success = process_ta_data_test(input_path, output_dir=output_folder,
+                                                   cancel_event=self.cancel_event, checkpoint=True,
+                                                   progress_callback=on_progress, histogram=histogram)
                 
-            if success:
+            if self.cancel_event.is_set():
+                self.log("⏹ PEMROSESAN DIBATALKAN")
+                self.log("💡 Jalankan ulang dengan input yang sama untuk melanjutkan dari checkpoint")
+                self.update_status("⏹ Pemrosesan dibatalkan")
+            elif success:
                 self.log("="*60)
                 self.log("🎉 PEMROSESAN DATA TA BERHASIL!")
                 self.log("="*60)
@@ -813,34 +931,32 @@ Email: hadifauzanhanif@gmail.com
                     self.log("✅ Data berhasil diupload ke database")
                 else:
                     self.log("ℹ️ Mode test - tidak upload ke database")
-                self.log(f"📁 Hasil tersimpan di: {self.output_folder.get()}")
+                self.log(f"📁 Hasil tersimpan di: {output_folder}")
                 
                 self.update_status("✅ Pemrosesan berhasil!")
                 
                 # Show success message
                 mode_text = "dengan upload database" if upload_db else "mode test"
-                messagebox.showinfo("Berhasil!", 
+                self.show_dialog('info', "Berhasil!", 
                     f"Pemrosesan data TA berhasil {mode_text}!\n\n"
-                    f"Hasil tersimpan di:\n{self.output_folder.get()}\n\n"
+                    f"Hasil tersimpan di:\n{output_folder}\n\n"
                     f"Silakan cek file output dan log untuk detail.")
                     
             else:
                 self.log("❌ PEMROSESAN GAGAL!")
                 self.log("💡 Periksa log error di atas untuk detail masalah")
                 self.update_status("❌ Pemrosesan gagal!")
-                messagebox.showerror("Error", 
+                self.show_dialog('error', "Error", 
                     "Pemrosesan data TA gagal!\n\n"
                     "Silakan periksa log untuk detail error.")
                     
         except Exception as e:
             self.log(f"❌ Error tidak terduga: {str(e)}")
             self.update_status("❌ Error terjadi!")
-            messagebox.showerror("Error", f"Terjadi error:\n{str(e)}")
+            self.show_dialog('error', "Error", f"Terjadi error:\n{str(e)}")
             
         finally:
-            self.is_processing = False
-            self.progress.stop()
-            self.process_button.config(state='normal')
+            self.events.post('finished')
             
     def start_processing(self):
         """Start processing in background thread"""
@@ -865,19 +981,53 @@ Email: hadifauzanhanif@gmail.com
             return
             
         # Run processing in separate thread
-        thread = threading.Thread(target=self.processing_thread)
+        self.is_processing = True
+        self.process_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.cancel_event.clear()
+        self.progress['value'] = 0
+        self.progress_var.set("")
+        thread = threading.Thread(target=self.processing_thread, args=(
+            self.input_path.get(), self.output_folder.get(), self.upload_to_db.get(),
+            self.incremental.get(), self.delta_upload.get(), self.save_histogram.get()))
         thread.daemon = True
         thread.start()
         
+    def cancel_processing(self):
+        """Ask the running process (or database clear) to stop after the current batch"""
+        if self.is_processing and not self.cancel_event.is_set():
+            self.cancel_event.set()
+            self.cancel_button.config(state='disabled')
+            self.log("⏹ Membatalkan pemrosesan, menunggu batch yang sedang berjalan...")
+            self.update_status("Membatalkan...")
+    
     def on_closing(self):
         """Handle window closing"""
+        if self.is_closing:
+            return
         if self.is_processing:
             result = messagebox.askyesno("Konfirmasi", 
                 "Pemrosesan sedang berjalan!\n"
                 "Yakin ingin keluar dan menghentikan proses?")
             if not result:
                 return
-                
+            self.cancel_event.set()
+            self.process_button.config(state='disabled')
+            self.cancel_button.config(state='disabled')
+            self.log("⏹ Menunggu batch yang sedang berjalan selesai sebelum keluar...")
+            self.update_status("Menutup aplikasi...")
+        
+        self.is_closing = True
+        self.close_when_idle()
+    
+    def close_when_idle(self):
+        """Destroy the window once the worker thread has stopped at a checkpoint"""
+        if self.is_processing:
+            self.root.after(self.EVENT_POLL_MS, self.close_when_idle)
+            return
+        
+        # Tutup koneksi database yang masih ada di pool
+        dispose_engines()
         self.root.destroy()
 
 def main():
@@ -970,4 +1120,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Diperlukan agar process pool berjalan pada executable Windows
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+import os
+import sys
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import TA_daily_process_module as ta  # noqa: E402
+
+def make_ta_rows(cells=12, days=2, seed=0, start_date="2025-06-01"):
+    """
+    Ericsson TA rows as strings: random counts plus rows with '\\N',
+    empty fields, an empty histogram and an all-'\\N' histogram
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    for day in range(days):
+        date_id = (pd.Timestamp(start_date) + pd.Timedelta(days=day)).strftime("%Y-%m-%d")
+        for cell in range(cells):
+            site = cell // 3
+            counts = [str(v) for v in rng.poisson(rng.uniform(0.5, 40), size=len(ta.TA_DISTR_COLS))]
+            kind = cell % 6
+            if kind == 1:
+                for i in rng.choice(len(counts), size=5, replace=False):
+                    counts[i] = '\\N'
+            elif kind == 2:
+                for i in rng.choice(len(counts), size=5, replace=False):
+                    counts[i] = ''
+            elif kind == 3:
+                counts = ['0'] * len(counts)
+            elif kind == 4 and day == 0:
+                counts = ['\\N'] * len(counts)
+            rows.append([date_id, f"JKT{site:03d}_ERBS", f"JKT{site:03d}_L18{cell % 3 + 1}"] + counts)
+    return rows
+
+def write_ta_csv(path, rows):
+    header = ['DATE_ID', 'ERBS', 'EUtranCellFDD'] + ta.TA_DISTR_COLS
+    with open(path, 'w', newline='') as f:
+        f.write(','.join(header) + '\n')
+        for row in rows:
+            f.write(','.join(row) + '\n')
+    return str(path)
+
+@pytest.fixture
+def ta_csv(tmp_path):
+    """Small Ericsson TA CSV file"""
+    return write_ta_csv(tmp_path / "ta_input.csv", make_ta_rows())
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Module output directory redirected to a temporary folder"""
+    path = str(tmp_path / "output")
+    monkeypatch.setattr(ta, 'DEFAULT_OUTPUT_PATH', path)
+    return path
+
+class FakeResult:
+    def __init__(self, value=0, rowcount=0):
+        self.value = value
+        self.rowcount = rowcount
+
+    def scalar(self):
+        return self.value
+
+
+class FakeEngine:
+    """
+    Records executed SQL instead of talking to MariaDB. A query returns the
+    value of the first `results` key it contains, else 5; DELETE removes nothing.
+    """
+
+    def __init__(self, results=None):
+        self.results = results or {}
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        for fragment, value in self.results.items():
+            if fragment in sql:
+                return FakeResult(value)
+        return FakeResult(5)
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    begin = connect
@@ -0,0 +1,246 @@
+"""
+Reference implementation: row-by-row processing of the original
+TA_daily_process_module (before vectorization), used to check that the
+current pipeline produces the same output
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+def get_sector(cellname):
+    """
+    Extract sector from cell name
+    """
+    try:
+        # Ambil karakter terakhir dari nama cell
+        if cellname and len(cellname) > 0:
+            last_char = cellname[-1]
+            if last_char.isdigit():
+                return int(last_char)
+            else:
+                return 0
+        return 0
+    except:
+        return 0
+
+def get_band(neid, siteid):
+    """
+    Determine band based on NEID and SITEID
+    """
+    try:
+        # Logic untuk menentukan band berdasarkan NEID dan SITEID
+        if neid and siteid:
+            # Implementasi logic khusus untuk menentukan band
+            # Contoh sederhana - bisa disesuaikan dengan kebutuhan
+            if '1800' in str(neid).upper() or '18' in str(siteid).upper():
+                return '1800'
+            elif '900' in str(neid).upper() or '9' in str(siteid).upper():
+                return '900'
+            elif '2100' in str(neid).upper() or '21' in str(siteid).upper():
+                return '2100'
+            else:
+                return '1800'  # Default
+        return '1800'
+    except:
+        return '1800'
+
+def get_site_id(erbs_name):
+    """
+    Extract Site ID from ERBS name
+    """
+    try:
+        if not erbs_name:
+            return 'UNKNOWN'
+        
+        # Logic untuk extract Site ID dari nama ERBS
+        # Contoh: dari "JKTXXX_1" extract "JKTXXX"
+        site_id = str(erbs_name).split('_')[0] if '_' in str(erbs_name) else str(erbs_name)
+        
+        # Clean up site ID
+        site_id = re.sub(r'[^A-Za-z0-9]', '', site_id)
+        
+        return site_id[:20] if site_id else 'UNKNOWN'
+    except:
+        return 'UNKNOWN'
+
+def get_site_name(erbs_name, site_id):
+    """
+    Generate site name from ERBS name and Site ID
+    """
+    try:
+        if not erbs_name:
+            return 'UNKNOWN'
+        
+        # Logic untuk generate site name
+        # Bisa disesuaikan dengan naming convention yang digunakan
+        site_name = str(erbs_name).replace('_', ' ').title()
+        
+        # Limit length
+        return site_name[:50] if site_name else 'UNKNOWN'
+    except:
+        return 'UNKNOWN'
+
+def get_ne_id(cellname):
+    """
+    Extract NE ID from cell name
+    """
+    try:
+        if not cellname:
+            return 'UNKNOWN'
+        
+        # Logic untuk extract NE ID dari nama cell
+        # Contoh: dari "JKTXXX_1A" extract "JKTXXX"
+        ne_id = str(cellname).split('_')[0] if '_' in str(cellname) else str(cellname)[:-1]
+        
+        # Clean up NE ID
+        ne_id = re.sub(r'[^A-Za-z0-9]', '', ne_id)
+        
+        return ne_id[:20] if ne_id else 'UNKNOWN'
+    except:
+        return 'UNKNOWN'
+
+def calculate_percentiles_safe(row):
+    """
+    Calculate percentiles from TA distribution data safely
+    """
+    try:
+        # Kolom distribusi TA
+        distr_cols = [f'pmTaInit2Distr_{i:02d}' for i in range(35)]
+        
+        # Ambil data distribusi
+        distr_data = []
+        total_samples = 0
+        
+        for i, col in enumerate(distr_cols):
+            if col in row:
+                value = row[col]
+                if pd.notna(value) and value != '\\N':
+                    try:
+                        count = int(float(value))
+                        if count > 0:
+                            distr_data.extend([i] * count)
+                            total_samples += count
+                    except:
+                        continue
+        
+        if not distr_data or total_samples == 0:
+            return {
+                'Distr50': '\\N',
+                'Distr80': '\\N', 
+                'Distr90': '\\N',
+                'Distr95': '\\N',
+                'Distr100': '\\N',
+                'TotSample': 0
+            }
+        
+        # Calculate percentiles
+        distr_array = np.array(distr_data)
+        
+        p50 = np.percentile(distr_array, 50)
+        p80 = np.percentile(distr_array, 80)
+        p90 = np.percentile(distr_array, 90)
+        p95 = np.percentile(distr_array, 95)
+        p100 = np.percentile(distr_array, 100)
+        
+        return {
+            'Distr50': round(p50, 2),
+            'Distr80': round(p80, 2),
+            'Distr90': round(p90, 2),
+            'Distr95': round(p95, 2),
+            'Distr100': round(p100, 2),
+            'TotSample': total_samples
+        }
+        
+    except Exception as e:
+        return {
+            'Distr50': '\\N',
+            'Distr80': '\\N',
+            'Distr90': '\\N', 
+            'Distr95': '\\N',
+            'Distr100': '\\N',
+            'TotSample': 0
+        }
+
+def process_ericsson_data(df):
+    """
+    Process Ericsson CSV data and calculate TA percentiles
+    """
+    try:
+        print("[INFO] Memulai pemrosesan data Ericsson...")
+        
+        # Validasi kolom yang diperlukan
+        required_cols = ['DATE_ID', 'ERBS', 'EUtranCellFDD']
+        distr_cols = [f'pmTaInit2Distr_{i:02d}' for i in range(35)]
+        
+        missing_cols = []
+        for col in required_cols:
+            if col not in df.columns:
+                missing_cols.append(col)
+        
+        if missing_cols:
+            print(f"[ERROR] Kolom yang hilang: {missing_cols}")
+            return None
+        
+        # Check distribution columns
+        available_distr_cols = [col for col in distr_cols if col in df.columns]
+        if len(available_distr_cols) < 10:  # Minimal 10 kolom distribusi
+            print(f"[WARNING] Hanya {len(available_distr_cols)} kolom distribusi ditemukan")
+        
+        processed_data = []
+        
+        for idx, row in df.iterrows():
+            try:
+                # Calculate percentiles
+                percentiles = calculate_percentiles_safe(row)
+                
+                # Extract site information
+                erbs_name = str(row['ERBS'])
+                cell_name = str(row['EUtranCellFDD'])
+                site_id = get_site_id(erbs_name)
+                site_name = get_site_name(erbs_name, site_id)
+                sector = get_sector(cell_name)
+                ne_id = get_ne_id(cell_name)
+                band = get_band(ne_id, site_id)
+                
+                # Create processed row
+                processed_row = {
+                    'DateId': row['DATE_ID'],
+                    'Cell': cell_name,
+                    'SiteId': site_id,
+                    'SiteName': site_name,
+                    'Sector': sector,
+                    'Band': band,
+                    'NeId': ne_id,
+                    'Distr50': percentiles['Distr50'],
+                    'Distr80': percentiles['Distr80'],
+                    'Distr90': percentiles['Distr90'],
+                    'Distr95': percentiles['Distr95'],
+                    'Distr100': percentiles['Distr100'],
+                    'TotSample': percentiles['TotSample']
+                }
+                
+                processed_data.append(processed_row)
+                
+            except Exception as e:
+                print(f"[WARNING] Error processing row {idx}: {str(e)}")
+                continue
+        
+        if not processed_data:
+            print("[ERROR] Tidak ada data yang berhasil diproses")
+            return None
+        
+        # Create DataFrame
+        result_df = pd.DataFrame(processed_data)
+        
+        print(f"[SUCCESS] Berhasil memproses {len(result_df)} baris data")
+        return result_df
+        
+    except Exception as e:
+        print(f"[ERROR] Error dalam process_ericsson_data: {str(e)}")
+        return None
+
+def baseline_process_file(file_path):
+    """Original read + process of one file: pd.read_csv without options"""
+    return process_ericsson_data(pd.read_csv(file_path))
@@ -0,0 +1,51 @@
+import inspect
+import os
+import threading
+import time
+
+import TA_daily_process_module as ta
+
+
+def test_checkpoint_is_off_by_default(ta_csv, output_dir):
+    assert inspect.signature(ta.process_ta_data).parameters['checkpoint'].default is False
+    assert ta.process_ta_data_test(ta_csv, workers=1)
+    assert not os.path.exists(ta.get_checkpoint_dir())
+
+
+def test_run_key_depends_on_chunking(ta_csv, output_dir):
+    directories = set()
+    for chunksize, workers in [(None, 1), (5, 1), (None, 2)]:
+        checkpoint = ta.RunCheckpoint([ta_csv], settings={'chunksize': chunksize, 'workers': workers})
+        directories.add(checkpoint.directory)
+        checkpoint.discard()
+    assert len(directories) == 3
+
+
+def test_cancel_while_uploading_is_not_success(ta_csv, output_dir, monkeypatch):
+    cancel_event = threading.Event()
+    
+    def cancelled_upload(df, engine, cancel_event=None, **kwargs):
+        # Cancel datang saat upload berjalan; belum ada batch yang di-commit
+        time.sleep(0.2)
+        cancel_event.set()
+        return False
+    
+    monkeypatch.setattr(ta, 'create_db_connection', lambda *args, **kwargs: object())
+    monkeypatch.setattr(ta, 'upload_to_database', cancelled_upload)
+    assert not ta.process_ta_data(ta_csv, incremental=True, checkpoint=True, workers=1,
+                                  cancel_event=cancel_event)
+    
+    assert ta.list_manifest().empty
+    assert len(os.listdir(ta.get_checkpoint_dir())) == 1
+
+
+def test_database_sink_reports_dropped_parts(ta_csv, monkeypatch):
+    processed = ta.process_ericsson_data(ta.read_ta_csv(ta_csv))
+    cancel_event = threading.Event()
+    monkeypatch.setattr(ta, 'upload_to_database', lambda df, engine, **kwargs: cancel_event.set() or False)
+    sink = ta.DatabaseSink(engine=None, writers=1, cancel_event=cancel_event)
+    sink.open()
+    sink.write(processed)
+    sink.write(processed)
+    sink.close()
+    assert sink.cancelled and sink.unfinished == 2 and sink.rows == 0
@@ -0,0 +1,37 @@
+from datetime import date
+
+import pytest
+
+import TA_daily_process_module as ta
+from conftest import FakeEngine
+
+
+@pytest.fixture
+def partitions(monkeypatch):
+    monkeypatch.setattr(ta, 'get_date_partitions', lambda engine, table_name: [
+        ('p202505', date(2025, 6, 1), 10), ('p202506', date(2025, 7, 1), 10),
+        ('p202507', date(2025, 8, 1), 10), ('pfuture', None, 0),
+    ])
+
+
+def test_date_clear_only_touches_the_range(partitions):
+    engine = FakeEngine(results={'information_schema.STATISTICS': 0})
+    result = ta.clear_database(engine, 'date', from_date='2025-06-01', to_date='2025-07-15', table_name='t')
+    assert not any('TRUNCATE TABLE' in sql or 'MIN(DateId)' in sql for sql in engine.statements)
+    assert [sql for sql in engine.statements if 'TRUNCATE PARTITION' in sql] == \
+        ["ALTER TABLE `t` TRUNCATE PARTITION `p202506`"]
+    assert any(sql.startswith("DELETE FROM `t` WHERE DateId BETWEEN") for sql in engine.statements)
+    assert result['method'] == 'partition'
+
+
+def test_site_clear_does_not_alter_table_without_consent(capsys):
+    engine = FakeEngine(results={'information_schema.STATISTICS': 0})
+    ta.clear_database(engine, 'site', site_id='JKT001', table_name='t')
+    assert not any(sql.startswith('ALTER TABLE') for sql in engine.statements)
+    assert "tidak punya index SiteId" in capsys.readouterr().out
+
+
+def test_site_clear_creates_index_when_requested():
+    engine = FakeEngine(results={'information_schema.STATISTICS': 0})
+    ta.clear_database(engine, 'site', site_id='JKT001', table_name='t', create_index=True)
+    assert any('ADD INDEX' in sql for sql in engine.statements)
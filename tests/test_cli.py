@@ -0,0 +1,74 @@
+import glob
+import os
+import signal
+
+import pytest
+
+import TA_daily_process_module as ta
+import ta_cli
+
+
+@pytest.fixture(autouse=True)
+def restore_signal_handlers():
+    """main() installs SIGINT/SIGTERM handlers; restore them after each test"""
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+    yield
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+def test_no_db_run_writes_to_output_dir(ta_csv, output_dir, tmp_path):
+    chosen = str(tmp_path / "chosen")
+    report = str(tmp_path / "report.json")
+    assert ta_cli.main([ta_csv, '--no-db', '--output-dir', chosen, '--report', report]) == ta_cli.EXIT_OK
+    
+    assert len(glob.glob(os.path.join(chosen, "TA_processed_TEST_*.csv"))) == 1
+    assert os.path.exists(report)
+    # Folder default tidak disentuh dan variabel modul tidak diubah
+    assert ta.DEFAULT_OUTPUT_PATH == output_dir
+    assert not os.path.exists(output_dir)
+
+
+@pytest.mark.parametrize('argv', [
+    ['--workers', '0'],
+    ['--chunk-size', '0'],
+    ['--db-writers', '0'],
+    ['--no-db', '--incremental'],
+    ['--no-db', '--maintain-partitions'],
+    ['--no-db', '--retention-days', '7'],
+    ['--force'],
+    ['--retention-days', '0'],
+    ['--columnar', 'csv'],
+])
+def test_invalid_arguments_exit_2(ta_csv, argv):
+    with pytest.raises(SystemExit) as exc:
+        ta_cli.main([ta_csv] + argv)
+    assert exc.value.code == ta_cli.EXIT_USAGE
+
+
+def test_missing_input_exits_3(tmp_path):
+    assert ta_cli.main([str(tmp_path / "missing.csv"), '--no-db']) == ta_cli.EXIT_NO_INPUT
+    assert ta_cli.main([str(tmp_path), '--no-db']) == ta_cli.EXIT_NO_INPUT
+
+
+def test_database_unavailable_exits_4(ta_csv, output_dir, monkeypatch):
+    monkeypatch.setattr(ta, 'create_db_connection', lambda *args, **kwargs: None)
+    assert ta_cli.main([ta_csv]) == ta_cli.EXIT_DB_UNAVAILABLE
+
+
+def test_processing_failure_exits_1(tmp_path, output_dir):
+    bad_csv = tmp_path / "bad.csv"
+    bad_csv.write_text("kolom_lain\n1\n")
+    assert ta_cli.main([str(bad_csv), '--no-db']) == ta_cli.EXIT_FAILED
+
+
+def test_sigint_exits_130(ta_csv, output_dir, monkeypatch):
+    process = ta.process_ta_data_test
+    
+    def interrupted(*args, **kwargs):
+        # SIGINT sebelum pemrosesan: handler hanya menandai cancel
+        os.kill(os.getpid(), signal.SIGINT)
+        return process(*args, **kwargs)
+    
+    monkeypatch.setattr(ta, 'process_ta_data_test', interrupted)
+    assert ta_cli.main([ta_csv, '--no-db', '--checkpoint']) == ta_cli.EXIT_CANCELLED
@@ -0,0 +1,53 @@
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+import TA_daily_process_module as ta
+
+pytest.importorskip('pyarrow')
+
+def write_partitions(ta_csv, partition_dir):
+    sink = ta.ColumnarSink(partition_dir)
+    sink.open()
+    sink.write(ta.process_ericsson_data(ta.read_ta_csv(ta_csv)))
+    sink.close()
+    return sink
+
+def part_files(partition_dir):
+    return sorted(name for _, _, files in os.walk(partition_dir) for name in files)
+
+def test_two_runs_in_same_second_keep_their_parts(ta_csv, tmp_path):
+    partition_dir = str(tmp_path / "parts")
+    first = write_partitions(ta_csv, partition_dir)
+    files_first = part_files(partition_dir)
+    second = write_partitions(ta_csv, partition_dir)
+    
+    assert first.run_id != second.run_id
+    assert len(part_files(partition_dir)) == 2 * len(files_first)
+
+@pytest.mark.parametrize('date_from', ['2025-06-02', pd.Timestamp('2025-06-02'),
+                                       datetime.date(2025, 6, 2), datetime.datetime(2025, 6, 2)])
+def test_read_partitions_includes_first_day_for_any_date_type(ta_csv, tmp_path, date_from):
+    partition_dir = str(tmp_path / "parts")
+    write_partitions(ta_csv, partition_dir)
+    
+    df = ta.read_ta_partitions(partition_dir, date_from=date_from, date_to=date_from)
+    assert len(df) == 12
+    assert df['DateId'].dt.strftime('%Y-%m-%d').unique().tolist() == ['2025-06-02']
+
+def test_columnar_percentiles_round_like_database_edge(ta_csv, tmp_path):
+    partition_dir = str(tmp_path / "parts")
+    write_partitions(ta_csv, partition_dir)
+    
+    df = ta.read_ta_partitions(partition_dir).sort_values(['DateId', 'Cell']).reset_index(drop=True)
+    plain = ta.to_plain_frame(ta.process_ericsson_data(ta.read_ta_csv(ta_csv)))
+    plain = plain.sort_values(['DateId', 'Cell']).reset_index(drop=True)
+    for name, _ in ta.PERCENTILE_LEVELS:
+        pd.testing.assert_series_equal(df[name], plain[name], check_exact=True)
+
+def test_test_mode_writes_separate_partition_dir(ta_csv, output_dir):
+    assert ta.process_ta_data_test(ta_csv, workers=1, columnar_format='parquet')
+    assert os.path.isdir(os.path.join(output_dir, ta.PARTITION_TEST_DIRNAME))
+    assert not os.path.exists(os.path.join(output_dir, ta.PARTITION_DIRNAME))
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import TA_daily_process_module as ta
+from conftest import make_ta_rows, write_ta_csv
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Tiny capacity blocks so every append has to grow the cube"""
+    monkeypatch.setattr(ta, 'CUBE_CELLS_BLOCK', 4)
+    monkeypatch.setattr(ta, 'CUBE_DAYS_BLOCK', 1)
+    monkeypatch.setattr(ta, 'CUBE_COPY_CELLS', 3)
+
+
+def daily_frames(tmp_path, days=3):
+    """Processed frames with histograms, one per day"""
+    path = write_ta_csv(tmp_path / "cube.csv", make_ta_rows(cells=9, days=days, seed=3))
+    df = ta.process_ericsson_data(ta.read_ta_csv(path), histogram=True)
+    return [group.reset_index(drop=True) for _, group in df.groupby(df['DateId'].astype(str), observed=True)]
+
+
+def histogram_store(tmp_path, frames):
+    sink = ta.HistogramSink(str(tmp_path / "histogram"))
+    sink.open()
+    for frame in frames:
+        sink.write(frame)
+    sink.close()
+    return sink.partition_dir
+
+
+def append_all(directory, frames):
+    cube = ta.HistogramCube(directory)
+    for frame in frames:
+        cube.append(frame)
+    cube.flush()
+    return cube
+
+
+def assert_same_result(cube_result, store_result):
+    pd.testing.assert_frame_equal(cube_result.reset_index(drop=True), store_result.reset_index(drop=True),
+                                  check_dtype=False)
+
+
+@pytest.mark.parametrize('group_by', ['Cell', 'SiteId', None])
+def test_query_matches_histogram_store(tmp_path, group_by):
+    frames = daily_frames(tmp_path)
+    histogram_dir = histogram_store(tmp_path, frames)
+    append_all(str(tmp_path / "cube"), frames)
+    
+    cube = ta.HistogramCube(str(tmp_path / "cube"))
+    for date_from, date_to in [("2025-06-01", "2025-06-03"), ("2025-06-02", "2025-06-02"),
+                               (pd.Timestamp("2025-06-02"), pd.Timestamp("2025-06-03"))]:
+        assert_same_result(cube.query(date_from, date_to, group_by=group_by),
+                           ta.query_histogram_range(date_from, date_to, group_by=group_by,
+                                                    histogram_dir=histogram_dir))
+
+
+def test_grow_and_backfill_keep_data(tmp_path, small_blocks):
+    frames = daily_frames(tmp_path)
+    histogram_dir = histogram_store(tmp_path, frames)
+    directory = str(tmp_path / "cube")
+    
+    # Hari terakhir dulu, lalu hari sebelumnya (back-fill menggeser kolom ke kanan)
+    append_all(directory, [frames[2]])
+    append_all(directory, [frames[0], frames[1]])
+    
+    cube = ta.HistogramCube(directory)
+    assert cube.generation > 0
+    assert str(cube.dates()[0]) == "2025-06-01" and cube.days == 3
+    assert sorted(os.listdir(directory)) == sorted(
+        ['cube.json'] + [os.path.basename(path) for path in cube._array_paths()])
+    assert_same_result(cube.query("2025-06-01", "2025-06-03"),
+                       ta.query_histogram_range("2025-06-01", "2025-06-03", histogram_dir=histogram_dir))
+
+
+def test_append_overwrites_cell_day(tmp_path):
+    frames = daily_frames(tmp_path, days=1)
+    cube = append_all(str(tmp_path / "cube"), frames)
+    doubled = frames[0].copy()
+    doubled[ta.HISTOGRAM_COLS] = doubled[ta.HISTOGRAM_COLS].astype(np.int64) * 2
+    cube.append(doubled)
+    
+    window = cube.window("2025-06-01", "2025-06-01")
+    expected = doubled[ta.HISTOGRAM_COLS].to_numpy(dtype=np.uint32)
+    assert (window[[cube.cell_index[cell] for cell in doubled['Cell'].astype(str)], 0] == expected).all()
+
+
+def test_stale_arrays_are_removed_on_open(tmp_path):
+    directory = str(tmp_path / "cube")
+    append_all(directory, daily_frames(tmp_path, days=1))
+    for name in ("counts.dat.tmp", "counts.3.dat", "present.3.dat"):
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(b'\0' * 10)
+    
+    cube = ta.HistogramCube(directory)
+    assert sorted(os.listdir(directory)) == ['counts.dat', 'cube.json', 'present.dat']
+    assert len(cube.query("2025-06-01", "2025-06-01")) == 9
+
+
+def test_test_mode_uses_separate_cube_dir(ta_csv, output_dir):
+    assert ta.process_ta_data_test(ta_csv, workers=1, cube=True)
+    assert os.path.exists(os.path.join(ta.get_cube_dir(test_mode=True), 'cube.json'))
+    assert not os.path.exists(ta.get_cube_dir())
+
+
+def test_new_cell_rows_drop_data_of_unflushed_run(tmp_path):
+    frames = daily_frames(tmp_path)
+    directory = str(tmp_path / "cube")
+    append_all(directory, [frames[0].iloc[:3]])
+    
+    # Run yang crash: cell baru hari 2-3 sudah ditulis ke memmap, cube.json tidak diperbarui
+    crashed = ta.HistogramCube(directory)
+    crashed.append(frames[1])
+    crashed.append(frames[2])
+    crashed.counts.flush()
+    crashed.present.flush()
+    del crashed
+    
+    cube = ta.HistogramCube(directory)
+    assert len(cube.cells) == 3
+    cube.append(frames[0])
+    cube.append(frames[2].iloc[:3])
+    result = cube.query("2025-06-01", "2025-06-03").set_index('Cell')
+    new_cells = frames[0]['Cell'].astype(str).iloc[3:]
+    assert (result.loc[new_cells, 'Days'] == 1).all()
+    assert result.loc[new_cells, 'TotSample'].sum() == frames[0]['TotSample'].iloc[3:].astype(int).sum()
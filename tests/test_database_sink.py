@@ -0,0 +1,115 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import TA_daily_process_module as ta
+
+
+@pytest.fixture
+def processed(ta_csv):
+    return ta.process_ericsson_data(ta.read_ta_csv(ta_csv))
+
+
+class FakeUpload:
+    """
+    Stand-in for upload_to_database: commits rows in batches through
+    on_batch and can fail after a number of committed rows
+    """
+
+    def __init__(self, fail_after=None, failures=0, batch_size=5):
+        self.fail_after = fail_after
+        self.failures = failures
+        self.batch_size = batch_size
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, df, engine, batch_size=None, delta=False, on_batch=None, cancel_event=None):
+        with self.lock:
+            self.calls.append((threading.current_thread().name, df))
+            fail = self.failures > 0
+            if fail:
+                self.failures -= 1
+        limit = self.fail_after if fail else len(df)
+        for start in range(0, limit, self.batch_size):
+            on_batch(min(self.batch_size, limit - start))
+        return not fail
+
+
+def run_sink(frames, fake, monkeypatch, **kw):
+    monkeypatch.setattr(ta, 'upload_to_database', fake)
+    sink = ta.DatabaseSink(engine=None, **kw)
+    sink.open()
+    for df in frames:
+        sink.write(df)
+    sink.close()
+    return sink
+
+
+def keys(df):
+    return set(df['DateId'].astype(str) + '|' + df['Cell'].astype(str))
+
+
+def test_rows_are_routed_by_key(processed, monkeypatch):
+    fake = FakeUpload()
+    sink = run_sink([processed, processed], fake, monkeypatch, writers=3)
+    
+    assert sink.rows == 2 * len(processed)
+    writer_keys = {}
+    for thread_name, df in fake.calls:
+        writer_keys.setdefault(thread_name, set()).update(keys(df))
+    assert len(writer_keys) > 1
+    # Setiap key selalu lewat writer yang sama
+    assert sum(len(k) for k in writer_keys.values()) == len(keys(processed))
+
+
+def test_retry_continues_after_committed_batches(processed, monkeypatch):
+    fake = FakeUpload(fail_after=10, failures=1)
+    progress = ta.ProgressTracker([], upload=True)
+    sink = run_sink([processed], fake, monkeypatch, writers=1, progress=progress)
+    
+    assert sink.rows == len(processed)
+    assert [len(df) for _, df in fake.calls] == [len(processed), len(processed) - 10]
+    pd.testing.assert_frame_equal(fake.calls[1][1], processed.iloc[10:])
+    assert progress.snapshot()['rows_uploaded'] == len(processed)
+
+
+def test_failure_is_raised_from_close(processed, monkeypatch):
+    fake = FakeUpload(fail_after=0, failures=ta.DB_WRITER_RETRIES)
+    with pytest.raises(RuntimeError, match="Upload database gagal"):
+        run_sink([processed], fake, monkeypatch, writers=1)
+    assert len(fake.calls) == ta.DB_WRITER_RETRIES
+
+
+def test_resume_skips_committed_rows(processed, monkeypatch, ta_csv, output_dir):
+    checkpoint = ta.RunCheckpoint([ta_csv])
+    checkpoint.add_uploaded(ta.RunCheckpoint.part_id(processed), 15, len(processed))
+    fake = FakeUpload()
+    sink = run_sink([processed], fake, monkeypatch, writers=1, checkpoint=checkpoint)
+    
+    assert sink.rows == len(processed)
+    pd.testing.assert_frame_equal(fake.calls[0][1], processed.iloc[15:])
+    assert checkpoint.uploaded_rows(ta.RunCheckpoint.part_id(processed)) == len(processed)
+    checkpoint.discard()
+
+
+def test_writer_queue_is_bounded(processed, monkeypatch):
+    release = threading.Event()
+    
+    def blocking_upload(df, engine, on_batch=None, **kwargs):
+        release.wait(5)
+        on_batch(len(df))
+        return True
+    
+    monkeypatch.setattr(ta, 'upload_to_database', blocking_upload)
+    sink = ta.DatabaseSink(engine=None, writers=1)
+    sink.open()
+    producer = threading.Thread(target=lambda: [sink.write(processed) for _ in range(ta.DB_WRITER_QUEUE_SIZE + 3)])
+    producer.start()
+    producer.join(0.5)
+    # Writer sibuk dan antrian penuh: producer harus menunggu
+    assert producer.is_alive()
+    release.set()
+    producer.join(5)
+    sink.close()
+    assert sink.rows == (ta.DB_WRITER_QUEUE_SIZE + 3) * len(processed)
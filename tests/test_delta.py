@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+import TA_daily_process_module as ta
+
+
+@pytest.fixture
+def processed(ta_csv):
+    return ta.process_ericsson_data(ta.read_ta_csv(ta_csv))
+
+
+def database_rows(processed):
+    """Rows as they are stored in the table (NULL for missing percentiles)"""
+    rows = ta.to_plain_frame(processed)
+    rows['DateId'] = pd.to_datetime(rows['DateId']).dt.strftime('%Y-%m-%d')
+    return rows
+
+
+@pytest.fixture
+def engine(processed):
+    """SQLite table with 20 of the 24 rows: 3 changed, the rest equal after rounding"""
+    existing = database_rows(processed).iloc[:20].copy()
+    assert existing['Distr50'].isna().any()  # NULL == NULL harus dianggap sama
+    with_samples = existing.index[existing['Distr50'].notna()]
+    existing.loc[with_samples[0], 'Distr50'] += 0.004   # DECIMAL(10,2): tetap sama
+    existing.loc[with_samples[1], 'Distr50'] += 0.006   # dibulatkan 0.01 lebih besar
+    existing.loc[with_samples[2], 'Distr90'] += 1
+    existing.loc[with_samples[3], 'SiteName'] = 'Nama Lama'
+    
+    engine = create_engine("sqlite://")
+    existing.to_sql(ta.DB_CONFIG['table'], engine, index=False)
+    return engine
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    frames = []
+    
+    def fake_insert(df_upload, engine, table_name, batch_size):
+        for start in range(0, len(df_upload), batch_size):
+            frames.append(df_upload.iloc[start:start + batch_size])
+            yield len(frames[-1])
+    
+    monkeypatch.setattr(ta, '_upload_batches_insert', fake_insert)
+    return frames
+
+
+def test_compute_upload_delta_counts(processed, engine):
+    to_send, counts = ta.compute_upload_delta(database_rows(processed), engine, ta.DB_CONFIG['table'])
+    assert counts == {'inserted': 4, 'updated': 3, 'unchanged': 17}
+    assert len(to_send) == 7
+
+
+def test_delta_upload_sends_changes_and_credits_unchanged(processed, engine, sent, capsys):
+    credited = []
+    assert ta.upload_to_database(processed, engine, batch_size=5, method='insert', delta=True,
+                                 on_batch=credited.append)
+    
+    assert "Delta upload: 4 baru, 3 berubah, 17 tidak berubah" in capsys.readouterr().out
+    uploaded = pd.concat(sent)
+    assert len(uploaded) == 7
+    rows = database_rows(processed)
+    changed = rows.index[:20][rows['Distr50'].iloc[:20].notna()][1:4]
+    expected = rows.loc[list(changed) + list(range(20, 24))]
+    assert set(uploaded['Cell'] + uploaded['DateId']) == set(expected['Cell'] + expected['DateId'])
+    # Baris yang tidak berubah ikut dihitung ke progress
+    assert credited == [17, 5, 2]
+
+
+def test_delta_upload_without_changes_sends_nothing(processed, sent):
+    engine = create_engine("sqlite://")
+    database_rows(processed).to_sql(ta.DB_CONFIG['table'], engine, index=False)
+    credited = []
+    assert ta.upload_to_database(processed, engine, method='insert', delta=True, on_batch=credited.append)
+    assert sent == [] and credited == [len(processed)]
@@ -0,0 +1,35 @@
+from gui_events import ChannelWriter, EventChannel
+
+
+def emitted(lines, max_lines_per_second=1000):
+    channel = EventChannel()
+    writer = ChannelWriter(channel, max_lines_per_second=max_lines_per_second)
+    writer.write(''.join(line + '\n' for line in lines))
+    writer.close()
+    return [event['message'] for event in channel.drain()]
+
+
+def test_lines_differing_in_numbers_are_not_folded():
+    lines = [f"[INFO] File {i}: {i * 100} baris" for i in range(3)]
+    assert emitted(lines) == lines
+
+
+def test_identical_info_lines_are_folded():
+    messages = emitted(["[INFO] Menunggu..."] * 4 + ["[INFO] Selesai"])
+    assert messages == ["[INFO] Menunggu...", "    ... pesan serupa diulang 3 kali", "[INFO] Selesai"]
+
+
+def test_repeated_warnings_are_folded():
+    messages = emitted(["[WARNING] Kolom hilang"] * 3 + ["[WARNING] Kolom lain hilang"])
+    assert messages == ["[WARNING] Kolom hilang", "    ... pesan serupa diulang 2 kali", "[WARNING] Kolom lain hilang"]
+
+
+def test_errors_are_never_folded():
+    lines = ["[ERROR] Gagal upload"] * 3
+    assert emitted(lines) == lines
+
+
+def test_errors_pass_the_rate_limit():
+    messages = emitted([f"[INFO] baris {i}" for i in range(5)] + ["[ERROR] Gagal"], max_lines_per_second=2)
+    assert "[ERROR] Gagal" in messages
+    assert "[WARNING] 3 baris log dilewati (terlalu banyak pesan)" in messages
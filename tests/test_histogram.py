@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import TA_daily_process_module as ta
+import ta_baseline
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def histogram_dir(ta_csv, output_dir):
+    assert ta.process_ta_data_test(ta_csv, workers=1, histogram=True)
+    return ta.get_histogram_dir(test_mode=True)
+
+
+def expected_percentiles(raw, group_by):
+    """Baseline percentiles of the histograms summed per group"""
+    counts = raw[ta.TA_DISTR_COLS].replace('\\N', np.nan).apply(pd.to_numeric).fillna(0).astype(np.int64)
+    summed = counts.groupby(raw[group_by]).sum()
+    return {key: ta_baseline.calculate_percentiles_safe(row) for key, row in summed.iterrows()}
+
+
+def test_test_mode_uses_separate_histogram_dir(histogram_dir, output_dir):
+    assert histogram_dir.endswith(ta.HISTOGRAM_TEST_DIRNAME)
+    assert not ta.query_histogram_range("2025-06-01", "2025-06-02", histogram_dir=histogram_dir).empty
+    assert not os.path.exists(ta.get_histogram_dir())
+
+
+@pytest.mark.parametrize('date_from, date_to', [
+    ("2025-06-01", "2025-06-02"),
+    (pd.Timestamp("2025-06-01"), pd.Timestamp("2025-06-02")),
+])
+def test_multi_day_percentiles_are_exact(ta_csv, histogram_dir, date_from, date_to):
+    raw = pd.read_csv(ta_csv, dtype=str, keep_default_na=False)
+    expected = expected_percentiles(raw, 'EUtranCellFDD')
+    
+    result = ta.query_histogram_range(date_from, date_to, histogram_dir=histogram_dir).set_index('Cell')
+    assert sorted(result.index) == sorted(expected)
+    assert (result['Days'] == 2).all()
+    for cell, values in expected.items():
+        for name, _ in ta.PERCENTILE_LEVELS:
+            if values[name] == '\\N':
+                assert pd.isna(result.loc[cell, name])
+            else:
+                assert result.loc[cell, name] == pytest.approx(values[name], abs=1e-9)
+
+
+def test_single_day_matches_daily_output(ta_csv, histogram_dir):
+    daily = ta_baseline.baseline_process_file(ta_csv)
+    daily = daily[daily['DateId'].astype(str) == "2025-06-02"].set_index('Cell')
+    
+    result = ta.query_histogram_range("2025-06-02", "2025-06-02", histogram_dir=histogram_dir).set_index('Cell')
+    assert sorted(result.index) == sorted(daily.index)
+    assert (result['TotSample'] == daily['TotSample'].astype(int).reindex(result.index)).all()
+
+
+def test_group_by_site_and_total(histogram_dir):
+    by_cell = ta.query_histogram_range("2025-06-01", "2025-06-02", histogram_dir=histogram_dir)
+    by_site = ta.query_histogram_range("2025-06-01", "2025-06-02", group_by='SiteId', histogram_dir=histogram_dir)
+    total = ta.query_histogram_range("2025-06-01", "2025-06-02", group_by=None, histogram_dir=histogram_dir)
+    
+    assert by_site['TotSample'].sum() == by_cell['TotSample'].sum() == total['TotSample'].iloc[0]
+    assert len(by_site) == 4
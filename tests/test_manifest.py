@@ -0,0 +1,49 @@
+import glob
+import os
+import sqlite3
+
+import TA_daily_process_module as ta
+
+def test_manifest_entries_are_per_target(ta_csv, output_dir):
+    files, info = ta.filter_new_files([ta_csv], target='db1')
+    assert files == [ta_csv]
+    ta.record_processed_files(files, info, target='db1')
+    
+    assert ta.filter_new_files([ta_csv], target='db1')[0] == []
+    assert ta.filter_new_files([ta_csv], target='db2')[0] == [ta_csv]
+    assert ta.filter_new_files([ta_csv], target='db1', force=True)[0] == [ta_csv]
+
+def test_manifest_lives_in_given_output_dir(ta_csv, output_dir, tmp_path):
+    other_dir = str(tmp_path / "chosen")
+    files, info = ta.filter_new_files([ta_csv], target='db1', output_dir=other_dir)
+    ta.record_processed_files(files, info, target='db1', output_dir=other_dir)
+    
+    assert os.path.exists(ta.get_manifest_path(other_dir))
+    assert ta.filter_new_files([ta_csv], target='db1')[0] == [ta_csv]
+    assert len(ta.list_manifest(other_dir)) == 1
+
+def test_old_manifest_is_migrated_to_current_target(ta_csv, output_dir):
+    os.makedirs(output_dir)
+    stat = os.stat(ta_csv)
+    conn = sqlite3.connect(ta.get_manifest_path())
+    conn.execute("CREATE TABLE processed_files (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+                 "sha256 TEXT, processed_at TEXT)")
+    conn.execute("INSERT INTO processed_files VALUES (?, ?, ?, ?, ?)",
+                 (os.path.abspath(ta_csv), stat.st_size, stat.st_mtime, 'x', '2025-01-01 00:00:00'))
+    conn.commit()
+    conn.close()
+    
+    assert ta.filter_new_files([ta_csv])[0] == []
+    assert ta.list_manifest()['target'].tolist() == [ta.get_upload_target()]
+
+def test_incremental_requires_upload(ta_csv, output_dir):
+    assert ta.process_ta_data(ta_csv, upload_to_db=False, incremental=True) is False
+    assert not os.path.exists(ta.get_manifest_path())
+
+def test_output_goes_to_output_dir(ta_csv, output_dir, tmp_path):
+    chosen = str(tmp_path / "chosen")
+    assert ta.process_ta_data_test(ta_csv, workers=1, output_dir=chosen)
+    assert len(glob.glob(os.path.join(chosen, "TA_processed_TEST_*.csv"))) == 1
+    # Cache cell dan checkpoint juga mengikuti folder yang dipilih
+    assert os.path.exists(ta.get_cell_cache_path(chosen))
+    assert not os.path.exists(output_dir)
@@ -0,0 +1,29 @@
+from datetime import date, timedelta
+
+import TA_daily_process_module as ta
+from conftest import FakeEngine
+
+
+def future_partitions(monkeypatch, future_rows):
+    last_month = (date.today().replace(day=1) - timedelta(days=1)).replace(day=1)
+    monkeypatch.setattr(ta, 'get_date_partitions', lambda engine, table_name: [
+        (ta.partition_name(last_month), date.today().replace(day=1), 10), ('pfuture', None, future_rows),
+    ])
+
+
+def test_future_partitions_split_empty_maxvalue_partition(monkeypatch):
+    future_partitions(monkeypatch, future_rows=0)
+    engine = FakeEngine(results={'PARTITION (`pfuture`)': 0})
+    names = ta.ensure_future_partitions(engine, table_name='t', ahead=2)
+    assert len(names) == 2
+    assert any('REORGANIZE PARTITION `pfuture`' in sql for sql in engine.statements)
+
+
+def test_future_partitions_skip_non_empty_maxvalue_partition(monkeypatch, capsys):
+    for table_rows, results in [(3, {}), (0, {'PARTITION (`pfuture`)': 1})]:
+        future_partitions(monkeypatch, future_rows=table_rows)
+        engine = FakeEngine(results=results)
+        assert ta.ensure_future_partitions(engine, table_name='t') == []
+        assert not any(sql.startswith('ALTER TABLE') for sql in engine.statements)
+        assert "Partisi pfuture tidak kosong" in capsys.readouterr().out
+
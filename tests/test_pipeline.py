@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import TA_daily_process_module as ta
+from conftest import make_ta_rows, write_ta_csv
+
+class RecordingSink:
+    """Sink that keeps every frame it receives"""
+    name = 'record'
+    
+    def __init__(self):
+        self.frames = []
+    
+    def open(self):
+        self.frames = []
+    
+    def write(self, df):
+        self.frames.append(df)
+    
+    def close(self):
+        pass
+
+@pytest.fixture
+def ta_folder(tmp_path):
+    folder = tmp_path / "input"
+    folder.mkdir()
+    for day in range(3):
+        write_ta_csv(folder / f"day{day}.csv", make_ta_rows(cells=15, days=1, seed=day,
+                                                           start_date=f"2025-06-0{day + 1}"))
+    return str(folder)
+
+def run_pipeline(csv_files, **kwargs):
+    sink = RecordingSink()
+    pipeline = ta.TAPipeline([sink], prefetch=0, **kwargs)
+    assert pipeline.run(csv_files)
+    return pipeline, sink
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_chunked_output_is_bounded_and_identical(ta_folder, workers):
+    csv_files = ta.discover_csv_files(ta_folder)
+    _, expected = run_pipeline(csv_files, workers=1)
+    pipeline, chunked = run_pipeline(csv_files, workers=workers, chunksize=7)
+    
+    assert max(len(frame) for frame in chunked.frames) <= 7
+    pd.testing.assert_frame_equal(ta.to_plain_frame(ta.concat_processed_frames(chunked.frames)),
+                                  ta.to_plain_frame(ta.concat_processed_frames(expected.frames)))
+    assert sorted(pipeline.completed_files) == sorted(csv_files)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_failed_file_advances_progress_but_is_not_completed(ta_folder, workers):
+    bad_file = os.path.join(ta_folder, "bad.csv")
+    with open(bad_file, 'w') as f:
+        f.write("foo,bar\n1,2\n")
+    csv_files = ta.discover_csv_files(ta_folder)
+    progress = ta.ProgressTracker(csv_files)
+    
+    pipeline, _ = run_pipeline(csv_files, workers=workers, progress=progress)
+    
+    assert bad_file not in pipeline.completed_files
+    assert len(pipeline.completed_files) == len(csv_files) - 1
+    assert progress.files_completed == len(csv_files)
+
+def test_prefetch_reraises_reader_error(ta_folder, capsys):
+    def failing_frames(csv_files):
+        yield csv_files[0], ta.read_ta_csv(csv_files[0])
+        raise RuntimeError("disk hilang")
+    
+    pipeline = ta.TAPipeline([RecordingSink()], workers=1, prefetch=2)
+    pipeline._iter_frames = failing_frames
+    
+    assert pipeline.run(ta.discover_csv_files(ta_folder)) is None
+    assert "disk hilang" in capsys.readouterr().out
+
+def test_prefetch_wait_stops_on_cancel(ta_folder):
+    release = threading.Event()
+    
+    def slow_frames(csv_files):
+        release.wait(30)
+        yield from ()
+    
+    cancel_event = threading.Event()
+    pipeline = ta.TAPipeline([RecordingSink()], workers=1, prefetch=2, cancel_event=cancel_event)
+    pipeline._iter_frames = slow_frames
+    threading.Timer(0.2, cancel_event.set).start()
+    
+    start = time.perf_counter()
+    try:
+        assert pipeline.run(ta.discover_csv_files(ta_folder)) is None
+        assert time.perf_counter() - start < 5
+        assert pipeline.cancelled
+    finally:
+        release.set()
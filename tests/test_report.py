@@ -0,0 +1,25 @@
+import builtins
+import json
+
+import TA_daily_process_module as ta
+
+def test_run_report_is_written_next_to_output(ta_csv, output_dir):
+    assert ta.process_ta_data_test(ta_csv, workers=1)
+    report = ta.get_last_run_report()
+    
+    assert report['success'] and report['total_rows'] == 24
+    with open(report['report_file']) as f:
+        assert json.load(f)['total_rows'] == 24
+
+def test_report_write_error_does_not_fail_run(ta_csv, output_dir, monkeypatch, capsys):
+    real_open = builtins.open
+    
+    def failing_open(path, *args, **kwargs):
+        if str(path).endswith("_report.json"):
+            raise OSError("disk penuh")
+        return real_open(path, *args, **kwargs)
+    
+    monkeypatch.setattr(builtins, 'open', failing_open)
+    assert ta.process_ta_data_test(ta_csv, workers=1)
+    assert ta.get_last_run_report()['report_file'] is None
+    assert "[WARNING] Gagal menyimpan run report" in capsys.readouterr().out
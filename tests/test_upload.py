@@ -0,0 +1,107 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+import TA_daily_process_module as ta
+
+def unescape_load_data(text):
+    """Parse LOAD DATA text the way MariaDB does with ESCAPED BY '\\\\'"""
+    escapes = {'t': '\t', 'n': '\n', 'r': '\r', '0': '\0', '\\': '\\'}
+    rows = []
+    for line in text.split('\n')[:-1]:
+        row = []
+        for field in line.split('\t'):
+            if field == '\\N':
+                row.append(None)
+                continue
+            value, i = '', 0
+            while i < len(field):
+                if field[i] == '\\':
+                    value += escapes.get(field[i + 1], field[i + 1])
+                    i += 2
+                else:
+                    value += field[i]
+                    i += 1
+            row.append(value)
+        rows.append(row)
+    return rows
+
+def test_load_data_text_escapes_special_characters():
+    df = pd.DataFrame({
+        'Cell': ['JKT\\001', 'TAB\there', 'NL\nline', '\\N', 'plain "q"'],
+        'SiteName': ['a', None, 'c\r', 'd\0', 'e'],
+        'Distr50': [12.85, np.nan, 1.0, 0.5, 34.0],
+        'TotSample': [10, 0, 3, 2, 1],
+    })
+    rows = unescape_load_data(ta._load_data_text(df))
+    
+    assert [row[0] for row in rows] == df['Cell'].tolist()
+    assert [row[1] for row in rows] == ['a', None, 'c\r', 'd\0', 'e']
+    assert [row[2] for row in rows] == ['12.85', None, '1.0', '0.5', '34.0']
+    assert [row[3] for row in rows] == ['10', '0', '3', '2', '1']
+
+def test_load_data_text_matches_previous_format_for_plain_values(ta_csv):
+    df = ta.to_plain_frame(ta.process_ericsson_data(ta.read_ta_csv(ta_csv)))
+    previous = io.StringIO()
+    df.to_csv(previous, sep='\t', header=False, index=False, na_rep='\\N', lineterminator='\n')
+    
+    assert ta._load_data_text(df) == previous.getvalue()
+
+class RecordingConnection:
+    """DB-API connection stand-in that records executed statements"""
+
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    def commit(self):
+        pass
+
+    rollback = close = commit
+
+class RecordingEngine:
+    url = "mysql+pymysql://recording/db"
+
+    def __init__(self):
+        self.connection = RecordingConnection()
+
+    def raw_connection(self):
+        return self.connection
+
+def test_load_data_staging_table_is_not_partitioned(ta_csv):
+    df = ta.to_plain_frame(ta.process_ericsson_data(ta.read_ta_csv(ta_csv)))
+    engine = RecordingEngine()
+    assert list(ta._upload_batches_load_data(df, engine, 't', batch_size=10)) == [10, 10, 4]
+    
+    statements = engine.connection.statements
+    assert not any(' LIKE ' in sql for sql in statements)
+    assert "CREATE TEMPORARY TABLE `t_staging` SELECT * FROM `t` LIMIT 0" in statements
+    assert "ALTER TABLE `t_staging` ADD PRIMARY KEY (`DateId`, `Cell`)" in statements
+    assert statements[-1] == "DROP TEMPORARY TABLE IF EXISTS `t_staging`"
+
+def test_load_data_failure_is_remembered(ta_csv, monkeypatch):
+    calls = []
+    
+    def failing_load_data(df_upload, engine, table_name, batch_size):
+        calls.append('load_data')
+        raise RuntimeError("The used command is not allowed with this MariaDB version")
+        yield
+    
+    def insert(df_upload, engine, table_name, batch_size):
+        calls.append('insert')
+        yield len(df_upload)
+    
+    monkeypatch.setattr(ta, '_upload_batches_load_data', failing_load_data)
+    monkeypatch.setattr(ta, '_upload_batches_insert', insert)
+    monkeypatch.setattr(ta, '_LOAD_DATA_UNAVAILABLE', set())
+    df = ta.process_ericsson_data(ta.read_ta_csv(ta_csv))
+    engine = RecordingEngine()
+    for _ in range(3):
+        assert ta.upload_to_database(df, engine)
+    assert calls == ['load_data', 'insert', 'insert', 'insert']